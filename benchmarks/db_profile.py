@@ -0,0 +1,81 @@
+"""
+Compare the tuned SQLite engine profile (config.DB_PROFILE) against SQLite's
+defaults on the bot's own statements.
+
+    python benchmarks/db_profile.py [--raids 200] [--signups 2000]
+
+Each run uses a fresh database in a temporary directory.
+"""
+import argparse, asyncio, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DB_PROFILE, DB_STATEMENT_CACHE
+from database import DBManager
+
+
+async def run(profile: dict, statement_cache: int, raids: int, signups: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DBManager(os.path.join(tmp, "bench.db"), profile=profile, statement_cache=statement_cache)
+        await db.initialize()
+        results = {}
+
+        start = time.perf_counter()
+        for raid_id in range(raids):
+            await db.execute(
+                "INSERT INTO active_raids (raid_id, raid_name, channel_id, raid_type, start_timestamp, "
+                "ping_timestamp, duration, tz) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (raid_id, f"Raid {raid_id}", 1, "Crying Sky", 0, 0, "3 hours", "ET")
+            )
+        results["insert raid"] = (time.perf_counter() - start) / raids
+
+        start = time.perf_counter()
+        for i in range(signups):
+            await db.run_batch([(
+                "INSERT OR IGNORE INTO signups (raid_id, emoji, user_id) VALUES (?, ?, ?)",
+                [(i % raids, "1️⃣", i)]
+            )])
+        results["journal flush"] = (time.perf_counter() - start) / signups
+
+        # Reads while a writer keeps committing, as during a reaction storm
+        async def writer():
+            for raid_id in range(raids):
+                await db.execute("UPDATE active_raids SET duration = ? WHERE raid_id = ?", ("1 hour", raid_id))
+
+        async def reader():
+            for _ in range(raids):
+                await db.fetchall("SELECT raid_id, raid_name FROM active_raids ORDER BY raid_id DESC")
+
+        start = time.perf_counter()
+        write_task = asyncio.create_task(writer())
+        read_start = time.perf_counter()
+        await reader()
+        results["list raids under writes"] = (time.perf_counter() - read_start) / raids
+        await write_task
+        results["update raid"] = (time.perf_counter() - start) / raids
+
+        start = time.perf_counter()
+        for raid_id in range(raids):
+            await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+        results["delete raid"] = (time.perf_counter() - start) / raids
+
+        await db.close()
+        return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raids", type=int, default=200)
+    parser.add_argument("--signups", type=int, default=2000)
+    args = parser.parse_args()
+
+    baseline = await run({}, 128, args.raids, args.signups)
+    tuned = await run(DB_PROFILE, DB_STATEMENT_CACHE, args.raids, args.signups)
+
+    print(f"{'operation':<26}{'defaults':>12}{'profile':>12}{'speedup':>10}")
+    for op, base in baseline.items():
+        print(f"{op:<26}{base * 1e6:>10.0f}us{tuned[op] * 1e6:>10.0f}us{base / tuned[op]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
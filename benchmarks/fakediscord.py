@@ -0,0 +1,422 @@
+"""
+Local stand-in for the parts of the Discord REST API and gateway the bot uses.
+
+FakeDiscord serves both from one aiohttp.web app: point discord.py at it with
+patch_discord(), then run the bot as usual. The REST side keeps guild,
+channel, message and reaction state in memory, answers with Discord's
+rate-limit headers, and can add latency and spurious 429s. The gateway side
+speaks just enough of the protocol (HELLO, IDENTIFY, READY, GUILD_CREATE,
+heartbeats, member requests answered with GUILD_MEMBERS_CHUNK) for discord.py to connect, after which dispatch() pushes events
+such as MESSAGE_REACTION_ADD to the bot over the websocket.
+
+REST calls that change reactions produce the same gateway events Discord
+would send, so the bot also sees the fallout of its own seeding and pruning.
+"""
+import asyncio, itertools, json, random, time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import discord
+import yarl
+from aiohttp import WSMsgType, web
+from discord.gateway import DiscordWebSocket
+
+API_PREFIX = "/api/v10"
+EPOCH = "2025-01-01T00:00:00+00:00"
+
+# (requests, seconds) per bucket; reaction routes match Discord's per-channel limit
+REACTION_LIMIT = (1, 0.25)
+DEFAULT_LIMIT = (50, 1.0)
+
+
+def user_payload(uid: int, name: str, bot: bool = False) -> dict:
+    return {"id": str(uid), "username": name, "global_name": name, "discriminator": "0",
+            "avatar": None, "bot": bot}
+
+
+def member_payload(uid: int, name: str) -> dict:
+    return {"user": user_payload(uid, name), "nick": None, "roles": [], "joined_at": EPOCH,
+            "deaf": False, "mute": False, "flags": 0}
+
+
+def _json(data, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # discord.py only decodes bodies whose content type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), status=status,
+                        headers={"Content-Type": "application/json", **(headers or {})})
+
+
+@dataclass
+class FakeMessage:
+    id: int
+    channel_id: int
+    author_id: int
+    content: str
+    # emoji -> user ids in reaction order (dict keeps insertion order)
+    reactions: Dict[str, Dict[int, None]] = field(default_factory=dict)
+
+
+@dataclass
+class _Bucket:
+    limit: int
+    per: float
+    remaining: int = 0
+    reset_at: float = 0.0
+
+
+class FakeDiscord:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, p429: float = 0.0,
+                 enforce_limits: bool = True, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.p429 = p429
+        self.enforce_limits = enforce_limits
+        self.rng = random.Random(seed)
+        self._ids = itertools.count(1_300_000_000_000_000_000)
+
+        self.guild_id = self.next_id()
+        self.bot_id = self.next_id()
+        self.app_id = self.bot_id
+        self.members: Dict[int, str] = {}
+        self.channels: Dict[int, str] = {}
+        self.messages: Dict[int, FakeMessage] = {}
+
+        # (method, route template) -> count
+        self.requests: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self.events_sent = 0
+        self.member_requests = 0
+        self._buckets: Dict[Tuple[str, str, int], _Bucket] = {}
+
+        self._sockets: List[web.WebSocketResponse] = []
+        self._seq = 0
+        self.ready = asyncio.Event()
+        self.app = self._build_app()
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    # --- State setup -----------------------------------------------------
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def add_member(self, name: str) -> int:
+        uid = self.next_id()
+        self.members[uid] = name
+        return uid
+
+    def add_channel(self, name: str) -> int:
+        cid = self.next_id()
+        self.channels[cid] = name
+        return cid
+
+    def add_message(self, channel_id: int, content: str, author_id: Optional[int] = None) -> FakeMessage:
+        msg = FakeMessage(self.next_id(), channel_id, author_id or self.bot_id, content)
+        self.messages[msg.id] = msg
+        return msg
+
+    # --- Lifecycle -------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self.host = host
+
+    async def stop(self):
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def patch_discord(self):
+        """Point discord.py's REST base URL and default gateway at this server."""
+        discord.http.Route.BASE = f"http://{self.host}:{self.port}{API_PREFIX}"
+        DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(f"ws://{self.host}:{self.port}/gateway")
+
+    # --- Gateway ---------------------------------------------------------
+
+    async def dispatch(self, event: str, data: dict):
+        self._seq += 1
+        self.events_sent += 1
+        payload = json.dumps({"op": 0, "t": event, "s": self._seq, "d": data})
+        for ws in self._sockets:
+            await ws.send_str(payload)
+
+    def reaction_event(self, message: FakeMessage, emoji: str, uid: int, add: bool = True) -> Tuple[str, dict]:
+        data = {"user_id": str(uid), "channel_id": str(message.channel_id), "message_id": str(message.id),
+                "guild_id": str(self.guild_id), "emoji": {"id": None, "name": emoji},
+                "type": 0, "burst": False}
+        if add:
+            name = self.members.get(uid, "raidbot")
+            data["member"] = member_payload(uid, name)
+            if uid == self.bot_id:
+                data["member"]["user"]["bot"] = True
+            data["message_author_id"] = str(message.author_id)
+        return ("MESSAGE_REACTION_ADD" if add else "MESSAGE_REACTION_REMOVE"), data
+
+    async def _gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.append(ws)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+        try:
+            async for msg in ws:
+                if msg.type is not WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                op = payload.get("op")
+                if op == 1:
+                    await ws.send_json({"op": 11})
+                elif op == 2:
+                    await self._identify(ws)
+                elif op == 8:
+                    await self._request_members(ws, payload["d"])
+                # Presence updates etc. need no answer here
+        finally:
+            self._sockets.remove(ws)
+        return ws
+
+    async def _identify(self, ws: web.WebSocketResponse):
+        self._seq += 1
+        await ws.send_json({"op": 0, "t": "READY", "s": self._seq, "d": {
+            "v": 10, "user": user_payload(self.bot_id, "raidbot", bot=True),
+            "guilds": [{"id": str(self.guild_id), "unavailable": True}],
+            "session_id": "fake-session", "resume_gateway_url": str(DiscordWebSocket.DEFAULT_GATEWAY),
+            "application": {"id": str(self.app_id), "flags": 0},
+        }})
+        self._seq += 1
+        # Like Discord, a large guild arrives without its member list; it has to be chunked
+        large = len(self.members) + 1 > 250
+        members = [] if large else [member_payload(uid, name) for uid, name in self.members.items()]
+        members.append(member_payload(self.bot_id, "raidbot"))
+        members[-1]["user"]["bot"] = True
+        await ws.send_json({"op": 0, "t": "GUILD_CREATE", "s": self._seq, "d": {
+            "id": str(self.guild_id), "name": "Load Test", "owner_id": str(self.bot_id),
+            "roles": [{"id": str(self.guild_id), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0}],
+            "emojis": [], "stickers": [], "features": [], "threads": [], "voice_states": [],
+            "presences": [], "stage_instances": [], "guild_scheduled_events": [],
+            "channels": [self._channel(cid) for cid in self.channels],
+            "members": members, "member_count": len(self.members) + 1, "large": large,
+            "unavailable": False, "joined_at": EPOCH,
+        }})
+        self.ready.set()
+
+    async def _request_members(self, ws: web.WebSocketResponse, data: dict):
+        # Request Guild Members: by user ids, or by name prefix (query "" with limit 0 is everyone)
+        if data.get("user_ids") is not None:
+            wanted = [int(uid) for uid in data["user_ids"]]
+            found = [uid for uid in wanted if uid in self.members]
+            not_found = [str(uid) for uid in wanted if uid not in self.members]
+        else:
+            query = (data.get("query") or "").lower()
+            found = [uid for uid, name in self.members.items() if name.lower().startswith(query)]
+            found = found[:data["limit"]] if data.get("limit") else found
+            not_found = []
+        self.member_requests += 1
+        chunks = [found[i:i + 1000] for i in range(0, len(found), 1000)] or [[]]
+        for index, chunk in enumerate(chunks):
+            self._seq += 1
+            event = {"guild_id": str(self.guild_id), "members": [member_payload(uid, self.members[uid]) for uid in chunk],
+                     "chunk_index": index, "chunk_count": len(chunks), "nonce": data.get("nonce")}
+            if index == 0 and not_found:
+                event["not_found"] = not_found
+            await ws.send_json({"op": 0, "t": "GUILD_MEMBERS_CHUNK", "s": self._seq, "d": event})
+
+    # --- REST ------------------------------------------------------------
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/gateway", self._gateway)
+        r = API_PREFIX
+        routes = [
+            ("GET", "/users/@me", self._me),
+            ("GET", "/oauth2/applications/@me", self._app_info),
+            ("GET", "/gateway/bot", self._gateway_bot),
+            ("PUT", "/applications/{app_id}/commands", self._sync_commands),
+            ("PUT", "/applications/{app_id}/guilds/{guild_id}/commands", self._sync_commands),
+            ("GET", "/channels/{channel_id}", self._get_channel),
+            ("POST", "/channels/{channel_id}/messages", self._create_message),
+            ("GET", "/channels/{channel_id}/messages/{message_id}", self._get_message),
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}", self._edit_message),
+            ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me", self._add_reaction),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/{user}", self._remove_reaction),
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}", self._clear_reaction),
+            ("GET", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}", self._reaction_users),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, r + path, handler)
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        template = route.canonical[len(API_PREFIX):] if route is not None else request.path
+        if request.path == "/gateway":
+            return await handler(request)
+        key = (request.method, template)
+        self.requests[key] += 1
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+
+        major = int(request.match_info.get("channel_id", 0))
+        bucket = self._bucket(request.method, template, major)
+        now = time.monotonic()
+        if now >= bucket.reset_at:
+            bucket.remaining, bucket.reset_at = bucket.limit, now + bucket.per
+        exhausted = self.enforce_limits and bucket.remaining <= 0
+        if exhausted or (self.p429 and self.rng.random() < self.p429):
+            self.rate_limited[key] += 1
+            retry_after = max(bucket.reset_at - now, 0.05) if exhausted else 0.05 + self.rng.random() * 0.2
+            return _json(
+                {"message": "You are being rate limited.", "retry_after": retry_after, "global": False},
+                # discord.py only trusts 429s that came through Discord's proxy (Via header)
+                status=429, headers={"Via": "1.1 google", "X-RateLimit-Scope": "user" if exhausted else "shared",
+                                     **self._limit_headers(bucket, template, now)})
+        bucket.remaining -= 1
+        response = await handler(request)
+        response.headers.update(self._limit_headers(bucket, template, now))
+        return response
+
+    def _bucket(self, method: str, template: str, major: int) -> _Bucket:
+        key = (method if "/reactions/" in template else "*", template, major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            limit, per = REACTION_LIMIT if "/reactions/" in template and method != "GET" else DEFAULT_LIMIT
+            bucket = self._buckets[key] = _Bucket(limit, per, limit, time.monotonic() + per)
+        return bucket
+
+    @staticmethod
+    def _limit_headers(bucket: _Bucket, template: str, now: float) -> Dict[str, str]:
+        reset_after = max(bucket.reset_at - now, 0.0)
+        return {
+            "X-RateLimit-Limit": str(bucket.limit),
+            "X-RateLimit-Remaining": str(max(bucket.remaining, 0)),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": f"fake:{abs(hash(template)) % 10**8}",
+        }
+
+    def _channel(self, cid: int) -> dict:
+        return {"id": str(cid), "type": 0, "guild_id": str(self.guild_id), "name": self.channels[cid],
+                "position": 0, "permission_overwrites": [], "nsfw": False, "parent_id": None,
+                "rate_limit_per_user": 0, "topic": None, "last_message_id": None}
+
+    def _message(self, msg: FakeMessage) -> dict:
+        author = self.members.get(msg.author_id)
+        return {
+            "id": str(msg.id), "channel_id": str(msg.channel_id), "guild_id": str(self.guild_id),
+            "author": user_payload(msg.author_id, author or "raidbot", bot=author is None),
+            "content": msg.content, "timestamp": EPOCH, "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": [], "pinned": False, "type": 0, "flags": 0, "components": [],
+            "reactions": [
+                {"emoji": {"id": None, "name": emoji}, "count": len(users), "me": self.bot_id in users,
+                 "me_burst": False, "count_details": {"burst": 0, "normal": len(users)}, "burst_colors": []}
+                for emoji, users in msg.reactions.items() if users
+            ],
+        }
+
+    def _find_message(self, request: web.Request) -> FakeMessage:
+        msg = self.messages.get(int(request.match_info["message_id"]))
+        if msg is None or msg.channel_id != int(request.match_info["channel_id"]):
+            raise web.HTTPNotFound(text=json.dumps({"message": "Unknown Message", "code": 10008}),
+                                   content_type="application/json")
+        return msg
+
+    async def _me(self, request):
+        return _json(user_payload(self.bot_id, "raidbot", bot=True))
+
+    async def _app_info(self, request):
+        return _json({
+            "id": str(self.app_id), "name": "raidbot", "description": "", "icon": None,
+            "bot_public": False, "bot_require_code_grant": False, "verify_key": "0" * 64,
+            "owner": user_payload(self.bot_id, "owner"), "flags": 0, "summary": "",
+        })
+
+    async def _gateway_bot(self, request):
+        return _json({"url": str(DiscordWebSocket.DEFAULT_GATEWAY), "shards": 1,
+                                  "session_start_limit": {"total": 1000, "remaining": 1000,
+                                                          "reset_after": 0, "max_concurrency": 1}})
+
+    async def _sync_commands(self, request):
+        commands = await request.json()
+        return _json([
+            {**cmd, "id": str(self.next_id()), "application_id": str(self.app_id), "version": "1",
+             "type": cmd.get("type", 1), "default_member_permissions": None, "dm_permission": True}
+            for cmd in commands
+        ])
+
+    async def _get_channel(self, request):
+        cid = int(request.match_info["channel_id"])
+        if cid not in self.channels:
+            raise web.HTTPNotFound()
+        return _json(self._channel(cid))
+
+    async def _create_message(self, request):
+        cid = int(request.match_info["channel_id"])
+        body = await request.json()
+        return _json(self._message(self.add_message(cid, body.get("content", ""))))
+
+    async def _get_message(self, request):
+        return _json(self._message(self._find_message(request)))
+
+    async def _edit_message(self, request):
+        msg = self._find_message(request)
+        body = await request.json()
+        msg.content = body.get("content", msg.content)
+        return _json(self._message(msg))
+
+    async def _add_reaction(self, request):
+        msg = self._find_message(request)
+        emoji = request.match_info["emoji"]
+        if not msg.reactions.get(emoji) and sum(1 for users in msg.reactions.values() if users) >= 20:
+            return _json({"message": "Maximum number of reactions reached (20)", "code": 30010},
+                                     status=403)
+        users = msg.reactions.setdefault(emoji, {})
+        if self.bot_id not in users:
+            users[self.bot_id] = None
+            await self.dispatch(*self.reaction_event(msg, emoji, self.bot_id))
+        return web.Response(status=204)
+
+    async def _remove_reaction(self, request):
+        msg = self._find_message(request)
+        emoji, user = request.match_info["emoji"], request.match_info["user"]
+        uid = self.bot_id if user == "@me" else int(user)
+        if msg.reactions.get(emoji, {}).pop(uid, 0) is None:
+            await self.dispatch(*self.reaction_event(msg, emoji, uid, add=False))
+        return web.Response(status=204)
+
+    async def _clear_reaction(self, request):
+        msg = self._find_message(request)
+        emoji = request.match_info["emoji"]
+        if msg.reactions.pop(emoji, None):
+            await self.dispatch("MESSAGE_REACTION_REMOVE_EMOJI", {
+                "channel_id": str(msg.channel_id), "message_id": str(msg.id), "guild_id": str(self.guild_id),
+                "emoji": {"id": None, "name": emoji}})
+        return web.Response(status=204)
+
+    async def _reaction_users(self, request):
+        msg = self._find_message(request)
+        users = msg.reactions.get(request.match_info["emoji"], {})
+        limit = int(request.query.get("limit", 25))
+        after = int(request.query.get("after", 0))
+        page = sorted(uid for uid in users if uid > after)[:limit]
+        return _json([
+            user_payload(uid, self.members.get(uid, "raidbot"), bot=uid == self.bot_id) for uid in page
+        ])
+
+    # --- Direct state changes (what users do in the client) --------------
+
+    async def user_react(self, message: FakeMessage, emoji: str, uid: int, add: bool = True):
+        """Apply a user's reaction to the stored message and send the gateway event."""
+        users = message.reactions.setdefault(emoji, {})
+        if add:
+            users[uid] = None
+        else:
+            users.pop(uid, None)
+        await self.dispatch(*self.reaction_event(message, emoji, uid, add))
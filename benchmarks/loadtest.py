@@ -0,0 +1,256 @@
+"""
+Offline load test: run RaidBot against the local fake Discord API and gateway.
+
+    python benchmarks/loadtest.py [--raids 20] [--signups 200] [--storm-users 2000]
+                                  [--bad-ratio 0.05] [--latency-ms 30] [--jitter-ms 10]
+                                  [--p429 0.01] [--rate 0] [--live-roster inline|companion]
+
+Phases, each reported with throughput, latency and REST/429 counts:
+  1. load_persistent_raids restoring --raids stored raids, then background
+     hydration of all of them (untrusted, so every reaction is paged from the
+     fake API)
+  2. create_raid seeding: reactions added to a new signup post by the seeder
+  3. reaction storm: --storm-users users react to that post over the gateway,
+     --bad-ratio of them with emoji that are not allowed
+  4. prune drain: until the pruner has removed every disallowed reaction
+
+--rate caps the storm at that many gateway events per second (0 = unthrottled).
+--live-roster turns on LIVE_ROSTER, and the storm also reports how many roster
+edits its reactions were coalesced into.
+The bot runs on a throwaway database; nothing touches the real one.
+"""
+import argparse, asyncio, logging, os, random, sqlite3, statistics, sys, tempfile, time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DISCORD_TOKEN", "loadtest")
+
+from fakediscord import FakeDiscord
+
+BAD_EMOJIS = ["😀", "🍕", "🔥", "👍", "🎉"]
+
+
+def percentiles(samples: List[float]) -> str:
+    if not samples:
+        return "n/a"
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e3
+    return (f"p50 {pick(0.50):.2f} ms  p95 {pick(0.95):.2f} ms  p99 {pick(0.99):.2f} ms  "
+            f"max {ordered[-1] * 1e3:.2f} ms  mean {statistics.fmean(ordered) * 1e3:.2f} ms")
+
+
+def rest_summary(fake: FakeDiscord, before: Tuple[Dict, Dict]) -> str:
+    requests = {k: v - before[0].get(k, 0) for k, v in fake.requests.items() if v - before[0].get(k, 0)}
+    limited = {k: v - before[1].get(k, 0) for k, v in fake.rate_limited.items() if v - before[1].get(k, 0)}
+    lines = [f"    {method:6} {route:60} {count:6}  429s {limited.get((method, route), 0)}"
+             for (method, route), count in sorted(requests.items(), key=lambda kv: -kv[1])]
+    return "\n".join(lines) or "    (no REST calls)"
+
+
+def snapshot(fake: FakeDiscord) -> Tuple[Dict, Dict]:
+    return dict(fake.requests), dict(fake.rate_limited)
+
+
+async def live_roster_idle(bot, timeout: float = 120):
+    # Restored raids get one roster update each after hydration; let those finish
+    deadline = time.perf_counter() + timeout
+    while bot.live_roster and (bot.live_roster.pending or bot.live_roster._tasks) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def seed_database(path: str, fake: FakeDiscord, raids: int, signups: int, raid_type: str, rng: random.Random):
+    from raid_types import RAID_TYPES
+    from database import DBManager
+
+    emojis = RAID_TYPES[raid_type].emojis
+    channel_id = fake.add_channel("raids")
+    members = list(fake.members)
+    start = int(time.time()) + 7 * 86400
+
+    conn = sqlite3.connect(path)
+    cols = ", ".join(f"{n} {d}" for n, d in DBManager.EXPECTED_COLUMNS.items())
+    conn.execute(f"CREATE TABLE active_raids ({cols})")
+    for i in range(raids):
+        msg = fake.add_message(channel_id, f"Raid {i}")
+        for emoji in emojis:
+            msg.reactions[emoji] = {fake.bot_id: None}
+        for uid in rng.sample(members, min(signups, len(members))):
+            msg.reactions[rng.choice(emojis)][uid] = None
+        conn.execute(
+            "INSERT INTO active_raids (raid_id, raid_name, channel_id, raid_type, start_timestamp, "
+            "ping_timestamp, duration, tz) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (msg.id, f"Raid {i}", channel_id, raid_type, start + i * 60, start + i * 60 - 1800, "3 hours", "ET"))
+    conn.commit()
+    conn.close()
+    return channel_id
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    fake = FakeDiscord(args.latency_ms, args.jitter_ms, args.p429, seed=args.seed)
+    for i in range(max(args.storm_users, args.signups)):
+        fake.add_member(f"Player{i:05d}")
+    await fake.start()
+    fake.patch_discord()
+
+    tmp = tempfile.TemporaryDirectory()
+    db_path = os.path.join(tmp.name, "loadtest.db")
+    channel_id = seed_database(db_path, fake, args.raids, args.signups, args.raid_type, rng)
+
+    import config
+    config.LIVE_ROSTER = args.live_roster
+    import bot as bot_module
+    from database import db
+    from raid_types import RAID_TYPES
+    from registry import Raid, registry
+    from signups import RaidSignups
+
+    db.db_path = db_path
+    bot = bot_module.bot
+    bot.metrics_server = None
+    bot._connection.guild_ready_timeout = 0.1
+
+    # --- Phase 1: load_persistent_raids, timed inside setup_hook ----------
+    timings: Dict[str, float] = {}
+    load_persistent_raids = bot.load_persistent_raids
+
+    async def timed_load():
+        before = snapshot(fake)
+        start = timings["load_started"] = time.perf_counter()
+        await load_persistent_raids()
+        timings["load"] = time.perf_counter() - start
+        timings["load_rest"] = before
+
+    bot.load_persistent_raids = timed_load
+
+    # Per-event handler time and gateway-to-handled latency for the storm
+    sent_at: Dict[Tuple[int, str, int], float] = {}
+    handler_times: List[float] = []
+    end_to_end: List[float] = []
+    handle_reaction_add = bot_module.handle_reaction_add
+
+    async def timed_handle(payload):
+        start = time.perf_counter()
+        await handle_reaction_add(payload)
+        done = time.perf_counter()
+        handler_times.append(done - start)
+        sent = sent_at.pop((payload.message_id, str(payload.emoji), payload.user_id), None)
+        if sent is not None:
+            end_to_end.append(done - sent)
+
+    bot_module.handle_reaction_add = timed_handle
+
+    runner = asyncio.create_task(bot.start(os.environ["DISCORD_TOKEN"]))
+    ready = asyncio.create_task(bot.wait_until_ready())
+    await asyncio.wait([ready, runner], timeout=120, return_when=asyncio.FIRST_COMPLETED)
+    if not ready.done():
+        ready.cancel()
+        await fake.stop()
+        raise SystemExit(f"Bot did not become ready: {runner.exception() if runner.done() else 'timed out'}")
+    print(f"Fake Discord on port {fake.port}: latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"random 429 p={args.p429}, {len(fake.members)} members")
+
+    await bot.hydrator.join()
+    hydrated = time.perf_counter() - timings["load_started"]
+    print(f"\n[1] load_persistent_raids: {args.raids} raids x {args.signups} sign-ups")
+    print(f"    restored in {timings['load']:.2f}s, hydrated in {hydrated:.2f}s  ({args.raids / hydrated:.1f} raids/s)")
+    print(rest_summary(fake, timings["load_rest"]))
+
+    # --- Phase 2: seeding a new signup post, as create_raid does ---------
+    definition = RAID_TYPES[args.raid_type]
+    channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+    before = snapshot(fake)
+    start = time.perf_counter()
+    signup_msg = await channel.send(definition.render(name="Load test", timestamp="<t:0:F>",
+                                                      duration="3 hours", GUILD_MEMBER_PING=""))
+    raid = Raid(signup_msg.id, "Load test", args.raid_type, channel_id, int(time.time()) + 86400,
+                int(time.time()) + 84600, "3 hours", "ET", signup_msg)
+    bot_module.signups_cache[signup_msg.id] = RaidSignups(definition)
+    registry.add(raid)
+    progress = bot.seeder.seed(signup_msg, definition.emojis)
+    while progress.status == "running":
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    print(f"\n[2] create_raid seeding: {progress.added}/{progress.total} reactions, status {progress.status}")
+    print(f"    {elapsed:.2f}s  ({progress.added / elapsed:.1f} reactions/s)")
+    print(rest_summary(fake, before))
+
+    # --- Phase 3: reaction storm over the gateway ------------------------
+    fake_msg = fake.messages[signup_msg.id]
+    users = list(fake.members)[:args.storm_users]
+    plan = [(rng.choice(BAD_EMOJIS) if rng.random() < args.bad_ratio else rng.choice(definition.emojis), uid)
+            for uid in users]
+    bad = sum(1 for emoji, _ in plan if emoji not in definition.allowed)
+    handler_times.clear()
+    end_to_end.clear()
+    await live_roster_idle(bot)
+    roster_before = dict(bot.live_roster.counters) if bot.live_roster else {}
+    before = snapshot(fake)
+    start = time.perf_counter()
+    for emoji, uid in plan:
+        sent_at[(signup_msg.id, emoji, uid)] = time.perf_counter()
+        await fake.user_react(fake_msg, emoji, uid)
+        if args.rate:
+            await asyncio.sleep(1 / args.rate)
+    sent = time.perf_counter() - start
+    while len(end_to_end) < len(plan) and time.perf_counter() - start < 120:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    print(f"\n[3] reaction storm: {len(plan)} reactions ({bad} disallowed) on one signup post")
+    print(f"    sent in {sent:.2f}s, handled in {elapsed:.2f}s  ({len(end_to_end) / elapsed:.0f} events/s)")
+    print(f"    on_raw_reaction_add   {percentiles(handler_times)}")
+    print(f"    gateway -> handled    {percentiles(end_to_end)}")
+    if bot.live_roster:
+        await live_roster_idle(bot)
+        counts = {k: v - roster_before[k] for k, v in bot.live_roster.counters.items()}
+        print(f"    live roster ({args.live_roster}): {counts['touched']} changes -> {counts['edited']} edits "
+              f"after {time.perf_counter() - start:.2f}s, {counts['unchanged']} unchanged renders skipped, "
+              f"{counts['failed']} failed")
+
+    # --- Phase 4: prune drain ---------------------------------------------
+    start = time.perf_counter()
+    while (bot.pruner.pending or bot.pruner._scheduled) and time.perf_counter() - start < 300:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    left = sum(len(users) for emoji, users in fake_msg.reactions.items() if emoji not in definition.allowed)
+    print(f"\n[4] prune drain: {bad} disallowed reactions, {left} left after {elapsed:.2f}s "
+          f"({(bad - left) / elapsed if elapsed else 0:.0f} removals/s)")
+    print(f"    pruner counters {bot.pruner.counters}")
+    print(rest_summary(fake, before))
+
+    signups = bot_module.signups_cache[signup_msg.id]
+    print(f"\nFinal roster: {len(signups)} sign-ups cached, {len(plan) - bad} expected; "
+          f"{fake.events_sent} gateway events sent; loop {bot.loop_monitor.stats()['max_lag_ms']} ms max lag")
+
+    await bot.close()
+    await asyncio.gather(runner, return_exceptions=True)
+    await fake.stop()
+    tmp.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raids", type=int, default=20)
+    parser.add_argument("--signups", type=int, default=200)
+    parser.add_argument("--storm-users", type=int, default=2000)
+    parser.add_argument("--bad-ratio", type=float, default=0.05)
+    parser.add_argument("--raid-type", default="Crying Sky")
+    parser.add_argument("--latency-ms", type=float, default=30)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--p429", type=float, default=0.01)
+    parser.add_argument("--rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--live-roster", choices=("inline", "companion"))
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+        # 429 retries are counted in the report; one warning per retry drowns it out
+        logging.getLogger("discord.http").setLevel(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare startup time and memory with and without guild member chunking.
+
+    python benchmarks/member_modes.py [--members 20000] [--signups 300] [--latency-ms 5]
+
+Each mode runs in its own process against the local fake Discord: the bot
+starts, the guild becomes ready (after chunking, when it is on), and a raid
+with --signups sign-ups is rendered twice as /showsignups would, so the
+on-demand mode's member requests show up in the first render and its cache
+in the second. Reported per mode: time to ready, resident memory added by the
+bot, members cached, and both render times.
+"""
+import argparse, asyncio, gc, json, logging, os, random, subprocess, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DISCORD_TOKEN", "member-modes")
+
+MODES = {"chunked": True, "on-demand": False}
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+async def child(args) -> dict:
+    import config
+    config.CHUNK_GUILD_MEMBERS = MODES[args.child]
+    config.METRICS_PORT = None
+
+    from fakediscord import FakeDiscord
+    fake = FakeDiscord(args.latency_ms, seed=1)
+    for i in range(args.members):
+        fake.add_member(f"Player{i:06d}")
+    await fake.start()
+    fake.patch_discord()
+
+    import tempfile
+    tmp = tempfile.TemporaryDirectory()
+    import bot as bot_module
+    from database import db
+    from raid_types import RAID_TYPES
+    from roster import RosterIndex, render_signups
+    from signups import RaidSignups
+
+    db.db_path = os.path.join(tmp.name, "members.db")
+    bot = bot_module.bot
+    # Don't wait for more guilds; the fake has one
+    bot._connection.guild_ready_timeout = 0.1
+    gc.collect()
+    baseline = rss_mb()
+
+    started = time.perf_counter()
+    runner = asyncio.create_task(bot.start(os.environ["DISCORD_TOKEN"]))
+    while not bot.is_ready():
+        if runner.done():
+            raise SystemExit(f"Bot stopped before ready: {runner.exception()}")
+        await asyncio.sleep(0.01)
+    ready = time.perf_counter() - started
+    gc.collect()
+    ready_rss = rss_mb()
+
+    guild = bot.get_guild(fake.guild_id)
+    definition = RAID_TYPES["Crying Sky"]
+    signups = RaidSignups(definition)
+    for uid in random.Random(2).sample(list(fake.members), args.signups):
+        signups.add(definition.emojis[uid % len(definition.emojis)], uid)
+
+    renders = []
+    for _ in range(2):
+        start = time.perf_counter()
+        lookup = None
+        if bot.members is not None:
+            await bot.members.resolve(guild, {uid for _, uids in signups.items() for uid in uids})
+            lookup = lambda uid: bot.members.get(guild, uid)
+        roster = RosterIndex.build(guild, signups, lookup)
+        render_signups("Bench", definition.roles, roster)
+        renders.append(time.perf_counter() - start)
+
+    result = {
+        "ready_s": ready,
+        "rss_mb": ready_rss - baseline,
+        "cached": len(bot.members) if bot.members is not None else len(guild.members),
+        "rendered": len(roster.all_names()),
+        "first_render_ms": renders[0] * 1e3,
+        "second_render_ms": renders[1] * 1e3,
+        "member_requests": fake.member_requests,
+    }
+    await bot.close()
+    await asyncio.gather(runner, return_exceptions=True)
+    await fake.stop()
+    tmp.cleanup()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=20000)
+    parser.add_argument("--signups", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.INFO)
+        print(json.dumps(asyncio.run(child(args))))
+        return
+
+    print(f"{args.members} guild members, {args.signups} sign-ups rendered\n")
+    print(f"{'mode':10} {'ready':>8} {'RSS added':>10} {'cached':>8} {'requests':>9} "
+          f"{'1st render':>11} {'2nd render':>11}")
+    for mode in MODES:
+        out = subprocess.run([sys.executable, __file__, "--child", mode, "--members", str(args.members),
+                              "--signups", str(args.signups), "--latency-ms", str(args.latency_ms)],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{mode:10} {r['ready_s']:7.2f}s {r['rss_mb']:8.1f} MB {r['cached']:8} {r['member_requests']:9} "
+              f"{r['first_render_ms']:9.1f} ms {r['second_render_ms']:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
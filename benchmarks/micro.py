@@ -0,0 +1,233 @@
+"""
+Micro-benchmarks for the utils/views/roster hot paths, checked against stored baselines.
+
+    python benchmarks/micro.py                 # compare with baselines.json, exit 1 on regression
+    python benchmarks/micro.py --update        # re-record baselines.json
+    python benchmarks/micro.py -k sort_key     # only cases whose name contains "sort_key"
+
+Every case is timed as the best of --repeat runs. Timings are divided by a fixed
+pure-Python reference workload measured in the same run, so baselines recorded
+on one machine still mean something on another. A case fails when it is more
+than --threshold times its baseline (default 1.3, i.e. 30% slower), or than
+its own entry under "thresholds" in baselines.json for noisier cases; cases
+without a baseline are reported but never fail.
+"""
+import argparse, asyncio, json, os, random, sys, time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roster import RosterIndex, chunk_blocks, render_signups
+from raid_types import RAID_TYPES
+from signups import RaidSignups
+from utils import _TIME_PATTERNS, name_cache, sort_key, validate_time_input
+from views import CreateRaidFlow, CreateRaidView, TimezoneSelect, UpdateRaidView
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# One input per _TIME_PATTERNS shape, plus spacing/case variants and a rejected input
+TIME_INPUTS = ["6:30PM", "6PM", "18:30", "1830", "18", "6:30 pm", "12am", "0930", "99:99"]
+assert len(_TIME_PATTERNS) == 5, "update TIME_INPUTS when _TIME_PATTERNS changes"
+
+NAMES = ["Zoë", "Ålvar", "Émile", "ßeta", "Łukasz", "Nguyễn", "Σοφία", "Дмитрий", "李雷",
+         "bob_the_*builder*", "ｆｕｌｌｗｉｄｔｈ", "🔥Fire🔥", "🐉✨Drako✨🐉", "Mïçhèlle", "plain"]
+
+
+def run_coro(coro):
+    """Drive a coroutine that never suspends, without event loop overhead."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def make_guild(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    members = {uid: SimpleNamespace(id=uid, display_name=f"{rng.choice(NAMES)}{rng.randrange(1000)}")
+               for uid in range(1, count + 1)}
+    return SimpleNamespace(get_member=members.get), list(members)
+
+
+# --- Cases ----------------------------------------------------------------------
+# Each factory returns (calls per run, function running those calls).
+
+def case_validate_time_input():
+    def run():
+        for text in TIME_INPUTS:
+            try:
+                run_coro(validate_time_input(text))
+            except ValueError:
+                pass
+    return len(TIME_INPUTS), run
+
+
+def case_sort_key():
+    rng = random.Random(3)
+    names = [f"{rng.choice(NAMES)} {rng.choice(NAMES)}" for _ in range(200)]
+    return len(names), lambda: [sort_key(n) for n in names]
+
+
+def make_signups(uids: List[int]) -> RaidSignups:
+    definition = RAID_TYPES["Crying Sky"]
+    signups = RaidSignups(definition)
+    for uid in uids:
+        signups.add(definition.emojis[uid % len(definition.emojis)], uid)
+    return signups
+
+
+def case_render(size: int):
+    # /showsignups on a cold roster: build the index, then render its blocks
+    def factory():
+        guild, uids = make_guild(size)
+        signups = make_signups(uids)
+        roles = signups.definition.roles
+        name_cache.maxsize = max(name_cache.maxsize, size)
+        RosterIndex.build(guild, signups)  # warm the name cache, as in steady state
+        return 1, lambda: render_signups("Bench", roles, RosterIndex.build(guild, signups))
+    return factory
+
+
+def case_roster_add_remove(size: int):
+    # What each reaction costs a built index: 100 sign-ups added, then withdrawn
+    def factory():
+        guild, uids = make_guild(size + 100)
+        name_cache.maxsize = max(name_cache.maxsize, size + 100)
+        roster = RosterIndex.build(guild, make_signups(uids[:size]))
+        emojis = RAID_TYPES["Crying Sky"].emojis
+        churn = [(emojis[uid % len(emojis)], uid) for uid in uids[size:]]
+
+        def run():
+            for emoji, uid in churn:
+                roster.add(emoji, uid)
+            for emoji, uid in churn:
+                roster.remove(emoji, uid)
+        run()
+        return 2 * len(churn), run
+    return factory
+
+
+def case_create_view():
+    return 1, lambda: CreateRaidView(CreateRaidFlow("Bench"))
+
+
+def case_update_view():
+    flow = CreateRaidFlow("Bench")
+    flow.raid_type, flow.duration, flow.tz = "Crying Sky", "3 hours", "ET"
+    return 1, lambda: UpdateRaidView(flow)
+
+
+def case_timezone_select():
+    return 1, lambda: TimezoneSelect(row=3)
+
+
+def case_chunk_blocks(size: int):
+    def factory():
+        guild, uids = make_guild(size)
+        signups = make_signups(uids)
+        blocks = render_signups("Bench", signups.definition.roles, RosterIndex.build(guild, signups))
+        return 1, lambda: chunk_blocks(blocks)
+    return factory
+
+
+CASES: Dict[str, Callable[[], Tuple[int, Callable]]] = {
+    "validate_time_input": case_validate_time_input,
+    "sort_key": case_sort_key,
+    "render_signups[50]": case_render(50),
+    "render_signups[500]": case_render(500),
+    "render_signups[5000]": case_render(5000),
+    "RosterIndex.add/remove[500]": case_roster_add_remove(500),
+    "RosterIndex.add/remove[5000]": case_roster_add_remove(5000),
+    "CreateRaidView": case_create_view,
+    "UpdateRaidView": case_update_view,
+    "TimezoneSelect": case_timezone_select,
+    "chunk_blocks[500]": case_chunk_blocks(500),
+    "chunk_blocks[5000]": case_chunk_blocks(5000),
+}
+
+
+# --- Timing ---------------------------------------------------------------------
+
+def best_of(run: Callable, repeat: int, min_time: float = 0.05) -> Tuple[float, int]:
+    """Best seconds per run, looping each sample until it lasts at least min_time."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        samples.append((time.perf_counter() - start) / loops)
+    return min(samples), loops
+
+
+def reference_workload():
+    # Fixed mix of dict, string and sort work, the same kinds the cases do
+    data = [f"member{(i * 7919) % 10007}" for i in range(2000)]
+    return sorted({s: len(s) for s in data}.items())
+
+
+async def main_async(args) -> int:
+    # Views need a running event loop; everything else is plain synchronous code
+    reference, _ = best_of(reference_workload, args.repeat)
+    selected = {name: factory for name, factory in CASES.items() if not args.k or args.k in name}
+    results: Dict[str, float] = {}
+    print(f"reference workload {reference * 1e6:.1f} µs; threshold {args.threshold:.2f}x\n")
+    print(f"{'case':34} {'per call':>12} {'relative':>10} {'baseline':>10} {'ratio':>7}")
+
+    baselines, thresholds = {}, {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES) as f:
+            stored = json.load(f)
+        baselines, thresholds = stored["cases"], stored.get("thresholds", {})
+
+    failures: List[str] = []
+    for name, factory in selected.items():
+        calls, run = factory()
+        seconds, _ = best_of(run, args.repeat)
+        relative = seconds / reference
+        results[name] = relative
+        per_call = seconds / calls
+        baseline = baselines.get(name)
+        if baseline:
+            ratio = relative / baseline
+            status = "REGRESSED" if ratio > thresholds.get(name, args.threshold) else ""
+            if status:
+                failures.append(name)
+            print(f"{name:34} {per_call * 1e6:9.2f} µs {relative:10.4f} {baseline:10.4f} {ratio:6.2f}x {status}")
+        else:
+            print(f"{name:34} {per_call * 1e6:9.2f} µs {relative:10.4f} {'-':>10} {'-':>7}")
+
+    if args.update:
+        merged = {**baselines, **results}
+        with open(BASELINES, "w") as f:
+            json.dump({"unit": "seconds per run / reference workload", "cases": merged, "thresholds": thresholds},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nWrote {len(results)} baselines to {BASELINES}")
+        return 0
+    if failures:
+        print(f"\n{len(failures)} case(s) slower than their threshold: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help="record the current timings as baselines")
+    parser.add_argument("--threshold", type=float, default=1.3)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("-k", help="only run cases whose name contains this text")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
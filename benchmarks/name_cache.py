@@ -0,0 +1,96 @@
+"""
+Measure the display-name cache against recomputing escape_markdown and the
+NFKD sort key on every render.
+
+    python benchmarks/name_cache.py [--members 10000] [--renders 20]
+
+Members are synthetic objects with mixed-script, accented and markdown-heavy
+names; each render resolves and sorts the whole roster like /showsignups.
+"""
+import argparse, os, random, sys, time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from discord.utils import escape_markdown
+
+from roster import RosterIndex
+from raid_types import RAID_TYPES
+from signups import RaidSignups
+from utils import NameCache, name_cache, sort_key
+
+SAMPLES = ["Zoë", "Ålvar", "Émile", "ßeta", "Łukasz", "Nguyễn", "Σοφία", "Дмитрий",
+           "李雷", "bob_the_*builder*", "__init__", "ｆｕｌｌｗｉｄｔｈ", "🔥Fire🔥", "Mïçhèlle"]
+
+
+def make_guild(count: int):
+    rng = random.Random(42)
+    members = {
+        uid: SimpleNamespace(id=uid, display_name=f"{rng.choice(SAMPLES)}{rng.randrange(10_000)}")
+        for uid in range(count)
+    }
+    return SimpleNamespace(get_member=members.get), members
+
+
+def uncached_sorted_display_names(uids, guild):
+    names = []
+    for uid in uids:
+        member = guild.get_member(uid)
+        if member:
+            names.append(escape_markdown(member.display_name))
+    return sorted(names, key=sort_key)
+
+
+def cached_sorted_display_names(signups, guild):
+    # What /showsignups does on a cold roster: index every sign-up, then read the full roster
+    return RosterIndex.build(guild, signups).all_names()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--renders", type=int, default=20)
+    args = parser.parse_args()
+
+    guild, members = make_guild(args.members)
+    uids = list(members)
+    definition = RAID_TYPES["Crying Sky"]
+    signups = RaidSignups(definition)
+    for uid in uids:
+        signups.add(definition.emojis[uid % len(definition.emojis)], uid)
+
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        expected = uncached_sorted_display_names(uids, guild)
+    uncached = (time.perf_counter() - start) / args.renders
+
+    # Size the shared cache to the roster so the steady state is all hits
+    name_cache.maxsize = args.members
+    start = time.perf_counter()
+    cached_sorted_display_names(signups, guild)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        result = cached_sorted_display_names(signups, guild)
+    warm = (time.perf_counter() - start) / args.renders
+    assert [sort_key(n) for n in result] == [sort_key(n) for n in expected]
+
+    # Undersized cache: every render churns through evictions
+    small = NameCache(args.members // 2)
+    start = time.perf_counter()
+    for _ in range(args.renders):
+        for uid in uids:
+            small.lookup(members[uid])
+    churn = (time.perf_counter() - start) / args.renders
+
+    print(f"{args.members} members, {args.renders} renders")
+    print(f"uncached render       {uncached * 1e3:8.2f} ms")
+    print(f"cached, cold          {cold * 1e3:8.2f} ms")
+    print(f"cached, warm          {warm * 1e3:8.2f} ms  ({uncached / warm:.1f}x)")
+    print(f"lookups, half-size    {churn * 1e3:8.2f} ms  (evictions {small.evictions})")
+    print(f"stats                 {name_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Replay a recording made with EVENT_RECORD_PATH through the bot's own handlers, offline.
+
+    python benchmarks/replay.py events.rbev [--speed 0] [--dump rosters.json]
+                                            [--compare rosters.json] [--prune-latency-ms 0]
+
+Raids and their sign-ups are restored from the recording, then every reaction
+add/remove is fed to on_raw_reaction_add/remove in order. Sign-ups the live bot
+corrected from Discord (hydration, reconciliation) are replaced as recorded.
+--speed 1 keeps the recorded pacing, 10 replays ten times faster, 0 (the
+default) runs flat out.
+Disallowed reactions go through the real pruner against an offline message, so
+the prune path is exercised without Discord. Interactions are counted but not
+re-run, since they need Discord to answer them.
+
+--dump writes the final rosters (user ids per emoji per raid) as JSON;
+--compare checks them against an earlier dump and exits 1 on any difference,
+e.g. to confirm an optimization did not change who ended up signed up.
+"""
+import argparse, asyncio, json, logging, os, sys, tempfile, time
+from collections import Counter, defaultdict
+from types import SimpleNamespace
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DISCORD_TOKEN", "replay")
+
+import discord
+
+from loadtest import percentiles
+from recorder import (FIELD_SEP, FLAG_BOT, INTERACTION, KIND_NAMES, RAID_CLOSE, RAID_OPEN, REACTION_ADD,
+                      REACTION_REMOVE, SIGNUP, SIGNUP_RESET, read_events)
+
+
+class OfflineMessage:
+    """Stands in for a signup post when the pruner removes reactions."""
+
+    def __init__(self, message_id: int, latency: float, calls: Counter):
+        self.id = message_id
+        self.latency = latency
+        self.calls = calls
+
+    async def remove_reaction(self, emoji, member):
+        self.calls["remove_reaction"] += 1
+        await asyncio.sleep(self.latency)
+
+    async def clear_reaction(self, emoji):
+        self.calls["clear_reaction"] += 1
+        await asyncio.sleep(self.latency)
+
+
+def raw_payload(event, added: bool) -> discord.RawReactionActionEvent:
+    data = {"message_id": event.message_id, "channel_id": event.channel_id, "user_id": event.user_id, "type": 0}
+    payload = discord.RawReactionActionEvent(data, discord.PartialEmoji.from_str(event.text),
+                                             "REACTION_ADD" if added else "REACTION_REMOVE")
+    if added:
+        # Handlers only read .bot (and hand the member to the roster index)
+        payload.member = SimpleNamespace(id=event.user_id, bot=bool(event.flags & FLAG_BOT),
+                                         display_name=str(event.user_id))
+    return payload
+
+
+def final_rosters(registry, signups_cache) -> Dict[str, Dict[str, List[int]]]:
+    rosters = {}
+    for raid in registry:
+        signups = signups_cache.get(raid.raid_id)
+        rosters[str(raid.raid_id)] = {emoji: sorted(uids) for emoji, uids in signups.items()} if signups else {}
+    return rosters
+
+
+def compare(expected: dict, actual: dict) -> List[str]:
+    problems = []
+    for raid_id in sorted(set(expected) | set(actual)):
+        if raid_id not in actual or raid_id not in expected:
+            problems.append(f"raid {raid_id}: only in {'expected' if raid_id in expected else 'replay'}")
+            continue
+        for emoji in sorted(set(expected[raid_id]) | set(actual[raid_id])):
+            want, got = set(expected[raid_id].get(emoji, ())), set(actual[raid_id].get(emoji, ()))
+            if want != got:
+                problems.append(f"raid {raid_id} {emoji}: {len(got - want)} extra, {len(want - got)} missing")
+    return problems
+
+
+async def replay(args) -> int:
+    import bot as bot_module
+    from database import db
+    from raid_types import RAID_TYPES
+    from registry import Raid, registry
+    from signups import RaidSignups
+
+    bot, signups_cache = bot_module.bot, bot_module.signups_cache
+    tmp = tempfile.TemporaryDirectory()
+    db.db_path = os.path.join(tmp.name, "replay.db")
+    await db.initialize()
+    registry.start()
+
+    prune_calls: Counter = Counter()
+    latency = args.prune_latency_ms / 1000
+
+    async def resolve_offline(channel_id: int, message_id: int):
+        return OfflineMessage(message_id, latency, prune_calls)
+
+    bot.pruner._resolve_message = resolve_offline
+    bot.pruner.start()
+
+    kinds: Counter = Counter()
+    interactions: Counter = Counter()
+    timings: Dict[int, List[float]] = defaultdict(list)
+    skipped_types: Counter = Counter()
+    first_ts = None
+    started = time.perf_counter()
+
+    for event in read_events(args.recording):
+        kinds[event.kind] += 1
+        if args.speed:
+            first_ts = first_ts if first_ts is not None else event.ts
+            delay = started + (event.ts - first_ts) / args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if event.kind == RAID_OPEN:
+            raid_type, name = event.text.split(FIELD_SEP, 1)
+            if raid_type not in RAID_TYPES:
+                skipped_types[raid_type] += 1
+                continue
+            raid = Raid(event.message_id, name, raid_type, event.channel_id, 0, 0, "", "")
+            # A new session snapshots its raids again; start each one over
+            registry.load(raid)
+            signups_cache[raid.raid_id] = RaidSignups(raid.definition)
+            bot_module.rosters.drop(raid.raid_id)
+        elif event.kind == SIGNUP_RESET:
+            raid = registry.get(event.message_id)
+            if raid is not None:
+                # The SIGNUP records that follow hold the corrected sign-ups
+                signups_cache[raid.raid_id] = RaidSignups(raid.definition)
+                bot_module.rosters.drop(raid.raid_id)
+        elif event.kind == SIGNUP:
+            signups = signups_cache.get(event.message_id)
+            if signups is not None:
+                signups.add(event.text, event.user_id)
+        elif event.kind == RAID_CLOSE:
+            await bot.retire_raid(event.message_id)
+        elif event.kind in (REACTION_ADD, REACTION_REMOVE):
+            added = event.kind == REACTION_ADD
+            payload = raw_payload(event, added)
+            handler = bot_module.on_raw_reaction_add if added else bot_module.on_raw_reaction_remove
+            start = time.perf_counter()
+            await handler(payload)
+            timings[event.kind].append(time.perf_counter() - start)
+        elif event.kind == INTERACTION:
+            interactions[event.text] += 1
+
+    replayed = time.perf_counter() - started
+    while bot.pruner.pending or bot.pruner._scheduled:
+        await asyncio.sleep(0.01)
+    drained = time.perf_counter() - started
+
+    reactions = len(timings[REACTION_ADD]) + len(timings[REACTION_REMOVE])
+    print(f"Replayed {sum(kinds.values())} records in {replayed:.2f}s "
+          f"({reactions / replayed if replayed else 0:.0f} reactions/s), pruner drained at {drained:.2f}s")
+    print("  " + ", ".join(f"{KIND_NAMES.get(k, k)} {n}" for k, n in sorted(kinds.items())))
+    for kind in (REACTION_ADD, REACTION_REMOVE):
+        print(f"  {KIND_NAMES[kind]:16} {percentiles(timings[kind])}")
+    print(f"  pruner {bot.pruner.counters}, offline calls {dict(prune_calls)}")
+    if interactions:
+        print(f"  interactions (not re-run): {dict(interactions)}")
+    if skipped_types:
+        print(f"  raids skipped for unknown raid types: {dict(skipped_types)}")
+
+    rosters = final_rosters(registry, signups_cache)
+    print(f"  final rosters: {len(rosters)} raids, {sum(len(u) for r in rosters.values() for u in r.values())} sign-ups")
+    if args.dump:
+        with open(args.dump, "w") as f:
+            json.dump(rosters, f, indent=1, sort_keys=True, ensure_ascii=False)
+        print(f"  wrote {args.dump}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(json.load(f), rosters)
+        if problems:
+            print(f"Rosters differ from {args.compare}:")
+            for problem in problems[:50]:
+                print(f"  {problem}")
+            status = 1
+        else:
+            print(f"Rosters match {args.compare}")
+
+    await bot.pruner.stop()
+    await registry.stop()
+    await db.close()
+    tmp.cleanup()
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=0)
+    parser.add_argument("--dump")
+    parser.add_argument("--compare")
+    parser.add_argument("--prune-latency-ms", type=float, default=0)
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logs")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    sys.exit(asyncio.run(replay(args)))
+
+
+if __name__ == "__main__":
+    main()
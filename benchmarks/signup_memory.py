@@ -0,0 +1,82 @@
+"""
+Compare the memory of the compact per-raid sign-up storage (signups.RaidSignups)
+against the old dict of sets keyed by emoji.
+
+    python benchmarks/signup_memory.py [--raids 20] [--raid-type "Crying Sky"]
+
+Sign-ups are spread over the raid type's reactions with realistic 18-19 digit
+snowflake ids; about a third of users react twice. Memory is measured with
+tracemalloc over all raids, so shared objects (emoji strings, the definition)
+are not counted against either structure.
+"""
+import argparse, os, random, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from raid_types import RAID_TYPES
+from signups import RaidSignups
+
+SIZES = (50, 500, 5000)
+
+
+def make_signups(emojis, count: int, seed: int):
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        uid = rng.randrange(10**17, 2**63)
+        for emoji in rng.sample(emojis, 2 if rng.random() < 0.33 else 1):
+            pairs.append((emoji, str(uid)))
+    return pairs[:count]
+
+
+def build_sets(pairs):
+    cache = {}
+    for emoji, uid in pairs:
+        cache.setdefault(emoji, set()).add(int(uid))
+    return cache
+
+
+def build_compact(definition, pairs):
+    signups = RaidSignups(definition)
+    for emoji, uid in pairs:
+        signups.add(emoji, int(uid))
+    return signups
+
+
+def measure(build, workload):
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = [build(pairs) for pairs in workload]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--raids", type=int, default=20)
+    parser.add_argument("--raid-type", default="Crying Sky", choices=sorted(RAID_TYPES))
+    args = parser.parse_args()
+
+    definition = RAID_TYPES[args.raid_type]
+    emojis = list(definition.emojis)
+    print(f"{args.raids} raids of {args.raid_type!r} ({len(emojis)} reactions)")
+    print(f"{'signups':>8} {'dict of sets':>14} {'compact':>12} {'saved':>7} {'build sets':>11} {'build compact':>14}")
+
+    for count in SIZES:
+        # User ids are kept as text so each structure pays for the ints it keeps alive, as with gateway payloads
+        workload = [make_signups(emojis, count, seed) for seed in range(args.raids)]
+        sets_size, sets_time, sets = measure(build_sets, workload)
+        compact_size, compact_time, compact = measure(lambda p: build_compact(definition, p), workload)
+        for old, new in zip(sets, compact):
+            assert {emoji: set(uids) for emoji, uids in new.items()} == old
+
+        per_raid = lambda size: f"{size / args.raids / 1024:9.1f} KiB"
+        print(f"{count:>8} {per_raid(sets_size):>14} {per_raid(compact_size):>12} "
+              f"{1 - compact_size / sets_size:>6.0%} {sets_time / args.raids * 1e3:>8.2f} ms "
+              f"{compact_time / args.raids * 1e3:>11.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,37 @@
-import asyncio, logging, os
+import asyncio, functools, gc, hashlib, json, logging, os, resource, time
+from dataclasses import replace
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import discord
-from discord import Interaction
+from discord import Interaction, app_commands
 from discord.ext import commands
 from discord.ui import Select, View
 import pytz
 
-from config import GUILD_MEMBER_PING, RAID_REACTIONS, RAID_TEMPLATES, SIGNUP_MAPPINGS, TIMEZONE_MAPPING, TEST_CHANNEL_ID
+from config import (CHUNK_GUILD_MEMBERS, EVENT_RECORD_PATH, FORCE_COMMAND_SYNC, GUILD_MEMBER_PING, HYDRATION_CONCURRENCY, HYDRATION_WORKERS, LIVE_ROSTER, LOOP_LAG_THRESHOLD_MS, LOOP_MONITOR_INTERVAL_MS, MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL, MEMORY_BUDGET_MB, MEMORY_PROFILING, METRICS_HOST, METRICS_PORT, PRUNE_CLEAR_THRESHOLD, PRUNE_MAX_PENDING, PRUNE_WORKERS,
+                    REACTION_SEED_INTERVAL, RECONCILE_INTERVAL, RECONCILE_REQUEST_INTERVAL, REMINDER_OFFSETS, ROSTER_EDIT_DELAY, ROSTER_EDIT_INTERVAL, ROSTER_EDIT_MAX_DELAY, SIGNUP_COMPACT_INTERVAL, SIGNUP_FLUSH_MS,
+                    TIMEZONE_MAPPING, TEST_CHANNEL_ID, USE_UVLOOP)
+from budget import CacheAccount, MB, MemoryBudget, rss_bytes
 from database import db
-from utils import permission_check ,get_ping_mention, validate_time_input, fetch_signup_post, edit_signup_post, get_sorted_display_names
+from hydration import RaidHydrator
+from liveroster import LiveRosterUpdater
+from members import MemberResolver
+from memprofile import MemoryProfiler
+from loopmonitor import LoopMonitor, install_event_loop
+from aiohttp import web
+from metrics import EVENT_SECONDS, InstrumentedCommandTree, MetricsServer, metrics
+from registry import Raid, registry
+from roster import MAX_MESSAGE_LENGTH, RosterCache, chunk_blocks, render_live_roster, render_signups
+from journal import SignupJournal
+from pruner import ReactionPruner
+from reconciler import SignupReconciler
+from recorder import EventRecorder
+from raid_types import RAID_TYPES
+from seeding import ReactionSeeder
+from signups import RaidSignups
+from scheduler import ReminderScheduler
+from utils import admin_check, permission_check ,get_ping_mention, validate_time_input, fetch_signup_post, edit_signup_post, format_offset, name_cache
 from views import CreateRaidFlow, CreateRaidView, UpdateRaidView
 
 # Setup logging
@@ -23,129 +44,595 @@ if not TOKEN:
     logger.critical("DISCORD_TOKEN is not set; aborting startup.")
     import sys
     sys.exit(1)
+if LIVE_ROSTER not in (None, "inline", "companion"):
+    logger.critical(f"LIVE_ROSTER must be None, \"inline\" or \"companion\", not {LIVE_ROSTER!r}; aborting startup.")
+    import sys
+    sys.exit(1)
 
-active_raids = {}  # In-memory storage for active raids
-
-# In-memory cache for reactions by message
-signups_cache: Dict[int, Dict[str, Set[int]]] = {}
+# Bearer token for the /debug endpoints on the metrics server; unset disables them
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN")
+# Largest ?top= accepted by /debug/memory
+MEMORY_REPORT_MAX_TOP = 50
+
+# In-memory cache for reactions by message, compact per raid
+signups_cache: Dict[int, RaidSignups] = {}
+
+# Sorted display-name indexes per raid, built on first /showsignups
+rosters = RosterCache()
+
+def refresh_member_name(member: discord.Member):
+    """A display name changed; drop the cached name and re-sort the rosters it appears in."""
+    name_cache.invalidate(member.id)
+    rosters.on_member_update(member)
+
+def signup_content(raid: Raid) -> str:
+    """The signup post's announcement as /createraid and /updateraid render it."""
+    return raid.definition.render(
+        name=raid.name,
+        timestamp=f"<t:{raid.start_ts}:F>",
+        duration=raid.duration,
+        GUILD_MEMBER_PING=get_ping_mention(raid.channel_id)
+    )
 
 # Bot initialization
 class RaidBot(commands.Bot):
     def __init__(self):
-        super().__init__(command_prefix=[], intents=discord.Intents(guilds=True, guild_reactions=True, members=True))
+        # Without chunking no members are cached; MemberResolver fetches the ones a roster needs
+        member_options = {} if CHUNK_GUILD_MEMBERS else {
+            "chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags.none()}
+        # No message cache: signup posts are held by the registry
+        super().__init__(command_prefix=[], intents=discord.Intents(guilds=True, guild_reactions=True, members=True),
+                         tree_cls=InstrumentedCommandTree, max_messages=None, **member_options)
+        self.members = None if CHUNK_GUILD_MEMBERS else MemberResolver(
+            MEMBER_CACHE_SIZE, MEMBER_CACHE_TTL, on_name_change=refresh_member_name)
+        self.started_at = time.perf_counter()
+        # One heap-driven task fires every raid reminder
+        self.reminders = ReminderScheduler(self.send_reminder, REMINDER_OFFSETS)
+        # Write-behind persistence of sign-up reactions
+        self.journal = SignupJournal(db, SIGNUP_FLUSH_MS, SIGNUP_COMPACT_INTERVAL)
+        # Removes disallowed reactions with bounded, de-duplicated requests
+        self.pruner = ReactionPruner(self.resolve_raid_message, PRUNE_WORKERS, PRUNE_CLEAR_THRESHOLD, PRUNE_MAX_PENDING)
+        # Raids restored at startup are fetched from Discord after readiness, nearest ping first
+        self.hydrator = RaidHydrator(self._hydrate_raid, HYDRATION_WORKERS)
+        # Shared by every hydration: REST calls in flight, channel lookups, and per-phase REST time
+        self._hydration_limiter = asyncio.Semaphore(HYDRATION_CONCURRENCY)
+        self._hydration_channels: Dict[int, asyncio.Task] = {}
+        self._hydration_timings = {"channel": 0.0, "message": 0.0, "reactions": 0.0}
+        # Raids whose stored sign-ups only need their stale emoji re-fetched
+        self._trusted_signups: Set[int] = set()
+        # Bot accounts (this one included) seen reacting per raid and emoji when it was last
+        # paged; Discord's reaction counts include them, the sign-ups never do
+        self._reaction_bots: Dict[int, Dict[str, int]] = {}
+        self._hydration_report: Optional[asyncio.Task] = None
+        # Repairs sign-ups missed while the gateway was disconnected
+        self.reconciler = SignupReconciler(self.reconcile_raid, lambda: [raid.raid_id for raid in registry],
+                                           RECONCILE_INTERVAL, RECONCILE_REQUEST_INTERVAL)
+        # Background, bucket-paced reaction seeding for new signup posts
+        self.seeder = ReactionSeeder(REACTION_SEED_INTERVAL)
+        # Debounced edits of the roster shown in (or below) each signup post
+        self.live_roster = LiveRosterUpdater(self._render_live_roster, self._edit_live_roster, ROSTER_EDIT_DELAY,
+                                             ROSTER_EDIT_MAX_DELAY, ROSTER_EDIT_INTERVAL) if LIVE_ROSTER else None
+        # Optional capture of the gateway traffic for offline replay
+        self.recorder = EventRecorder(EVENT_RECORD_PATH) if EVENT_RECORD_PATH else None
+        # Names the coroutine whenever the event loop is blocked for too long
+        self.loop_monitor = LoopMonitor(LOOP_MONITOR_INTERVAL_MS / 1000, LOOP_LAG_THRESHOLD_MS / 1000)
+        # Prometheus endpoint served from this event loop
+        self.metrics_server = MetricsServer(metrics, METRICS_HOST, METRICS_PORT) if METRICS_PORT else None
+        # Sizes the caches from MEMORY_BUDGET_MB and evicts them near the limit
+        self.memory_budget = MemoryBudget(MEMORY_BUDGET_MB)
+        self._register_caches()
+        self._register_gauges()
+        # tracemalloc snapshots and per-group sizes for /botdebug memory and /debug/memory
+        self.profiler = MemoryProfiler()
+        self._register_memory_groups()
+        if MEMORY_PROFILING:
+            self.profiler.start()
+        if self.metrics_server:
+            self.metrics_server.app.router.add_get("/debug/memory", self._debug_memory)
+
+    def _register_memory_groups(self):
+        state = self._connection
+        # Shared objects reached from everywhere are sized once, under discord.py
+        self.profiler.stop_objects = lambda: [self, state, self.http, self.tree, self.loop, db, *self.guilds]
+        self.profiler.group("signups_cache", lambda: [signups_cache])
+        self.profiler.group("registry (active raids)", lambda: [registry])
+        self.profiler.group("rosters and names", lambda: [rosters, name_cache])
+        self.profiler.group("View objects", lambda: [o for o in gc.get_objects() if isinstance(o, View)])
+        self.profiler.group("discord.py caches", lambda: [
+            state._users, *self.guilds, state._emojis, state._stickers, state._private_channels, state._messages])
+        if self.members is not None:
+            self.profiler.group("on-demand members", lambda: [self.members])
+
+    async def memory_report(self, top: int = 10) -> str:
+        note = ""
+        if not self.profiler.tracing:
+            self.profiler.mark_baseline()
+            note = "tracemalloc was off: tracing started and baseline taken now; ask again later for growth.\n"
+        return note + await self.profiler.report_async(top)
+
+    async def _debug_memory(self, request: web.Request) -> web.Response:
+        if not DEBUG_TOKEN:
+            raise web.HTTPNotFound()
+        if request.headers.get("Authorization") != f"Bearer {DEBUG_TOKEN}":
+            raise web.HTTPUnauthorized()
+        try:
+            top = int(request.query.get("top", 10))
+        except ValueError:
+            raise web.HTTPBadRequest(text="top must be an integer")
+        if not 1 <= top <= MEMORY_REPORT_MAX_TOP:
+            raise web.HTTPBadRequest(text=f"top must be between 1 and {MEMORY_REPORT_MAX_TOP}")
+        return web.Response(text=await self.memory_report(top) + "\n")
+
+    def _register_caches(self):
+        # Bytes per entry measured with tracemalloc; shares split the cache half of the budget
+        budget = self.memory_budget
+        budget.add(CacheAccount("signups", lambda: sum(map(len, signups_cache.values())), 16, 0.15))
+        budget.add(CacheAccount("rosters", rosters.entries, 360, 0.20, evict=rosters.evict))
+        budget.add(CacheAccount("display names", lambda: len(name_cache), 200, 0.10, evict=name_cache.evict,
+                                resize=lambda limit: setattr(name_cache, "maxsize", limit)))
+        if self.members is not None:
+            budget.add(CacheAccount("members", lambda: len(self.members), 1100, 0.55, evict=self.members.evict,
+                                    resize=lambda limit: setattr(self.members, "maxsize", limit)))
+        else:
+            # discord.py's chunked member cache can't be trimmed; CHUNK_GUILD_MEMBERS = False can
+            budget.add(CacheAccount("members (discord.py)", lambda: sum(len(g.members) for g in self.guilds),
+                                    1100, 0.55))
+
+    def _register_gauges(self):
+        metrics.gauge("raidbot_pending_pings", "Reminder pings queued in the scheduler.",
+                      lambda: self.reminders.pending)
+        metrics.gauge("raidbot_pending_prunes", "Disallowed reactions waiting to be removed.",
+                      lambda: self.pruner.pending)
+        for name, help in (("queued", "Disallowed reactions accepted by the pruner."),
+                           ("coalesced", "Disallowed reactions already pending removal when reported again."),
+                           ("dropped", "Disallowed reactions not queued because the pruner was full."),
+                           ("failed", "Reaction removals that raised.")):
+            metrics.counter(f"raidbot_prune_{name}_total", help, functools.partial(self.pruner.counters.get, name))
+        metrics.gauge("raidbot_pending_hydrations", "Restored raids not yet loaded from Discord.",
+                      lambda: self.hydrator.pending)
+        metrics.counter("raidbot_reconciled_emoji_total", "Emoji whose sign-ups were corrected by reconciliation.",
+                        lambda: self.reconciler.counters["corrected"])
+        metrics.gauge("raidbot_cached_members", "Guild members held by discord.py or the on-demand member cache.",
+                      lambda: len(self.members) if self.members is not None
+                      else sum(len(g.members) for g in self.guilds))
+        metrics.counter("raidbot_cache_evictions_total", "Cache entries evicted to stay inside the memory budget.",
+                        lambda: self.memory_budget.evictions)
+        if self.live_roster:
+            metrics.counter("raidbot_live_roster_edits_total", "Live roster messages edited or posted.",
+                            lambda: self.live_roster.counters["edited"])
+            metrics.counter("raidbot_live_roster_unchanged_total", "Live roster renders not sent because nothing changed.",
+                            lambda: self.live_roster.counters["unchanged"])
+        metrics.gauge("raidbot_name_cache_entries", "Users whose escaped display name and sort key are cached.",
+                      lambda: len(name_cache))
+        metrics.counter("raidbot_name_cache_hits_total", "Roster renders that found a user's name cached.",
+                        lambda: name_cache.hits)
+        metrics.counter("raidbot_name_cache_misses_total", "Roster renders that had to escape and normalize a name.",
+                        lambda: name_cache.misses)
+        metrics.gauge("raidbot_active_raids", "Raids tracked in the registry.", lambda: len(registry))
+        metrics.gauge("raidbot_signups_cache_raids", "Raids with sign-ups held in memory.",
+                      lambda: len(signups_cache))
+        metrics.gauge("raidbot_signups_cache_entries", "Sign-ups held in memory across all raids.",
+                      lambda: sum(map(len, signups_cache.values())))
+        metrics.gauge("raidbot_gateway_latency_seconds", "Discord gateway heartbeat latency.",
+                      lambda: self.latency)
+        metrics.counter("raidbot_event_loop_stalls_total", "Heartbeats that ran later than the lag threshold.",
+                        lambda: self.loop_monitor.over_threshold)
+        metrics.gauge("raidbot_event_loop_max_lag_seconds", "Worst event loop lag since startup.",
+                      lambda: self.loop_monitor.max_lag)
 
     async def setup_hook(self):
+        started = time.perf_counter()
+        self.loop_monitor.start()
+        if self.metrics_server:
+            await self.metrics_server.start()
         await db.initialize()
+        registry.start()
+        self.reminders.start()
+        self.pruner.start()
+        self.hydrator.start()
+        self.reconciler.start()
+        self.memory_budget.start()
         await self.load_persistent_raids()
+        if self.profiler.tracing:
+            self.profiler.mark_baseline()
+        self.journal.start()
+        if self.recorder:
+            self.recorder.start(registry, signups_cache)
+        sync_seconds = await self.sync_commands()
+        total = time.perf_counter() - started
+        if sync_seconds is None:
+            logger.info(f"Persistent raids loaded in {total:.2f}s; slash commands unchanged, sync skipped.")
+        else:
+            logger.info(f"Slash commands synchronized and persistent raids loaded in {total:.2f}s "
+                        f"({sync_seconds:.2f}s syncing, {total - sync_seconds:.2f}s without the sync).")
+
+    def command_tree_hash(self) -> str:
+        # The same payload tree.sync() uploads, plus the application it goes to
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+        data = json.dumps({"application_id": self.application_id, "commands": payload}, sort_keys=True)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    async def sync_commands(self):
+        """Sync the command tree if it changed since the last sync; returns the seconds spent, or None if skipped."""
+        digest = self.command_tree_hash()
+        force = FORCE_COMMAND_SYNC or os.getenv("FORCE_COMMAND_SYNC") == "1"
+        if not force and await db.get_meta("command_tree_hash") == digest:
+            return None
+        started = time.perf_counter()
         await self.tree.sync()
-        logger.info("Slash commands synchronized and persistent raids loaded!")
+        await db.set_meta("command_tree_hash", digest)
+        return time.perf_counter() - started
 
     async def load_persistent_raids(self):
         raids = await db.fetchall("""
-            SELECT raid_id, raid_name, channel_id, ping_timestamp, raid_type
+            SELECT raid_id, raid_name, channel_id, raid_type, start_timestamp, ping_timestamp, duration, tz,
+                   roster_message_id
             FROM active_raids
         """)
         current_time = datetime.now(pytz.utc)
-        for raid in raids:
-            raid_id, raid_name, channel_id_str, ping_timestamp, raid_type = raid
-            channel_id = int(channel_id_str)
-            try:
-                channel = self.get_channel(channel_id)
-                if not channel:
-                    channel = await self.fetch_channel(channel_id)
-            except Exception as e:
-                logger.warning(f"Could not fetch channel {channel_id} for raid {raid_id}: {e}")
+        started = time.perf_counter()
+
+        # Sign-ups persisted by the journal; only trusted after a clean shutdown
+        stored, synced = await self.journal.load()
+        clean_shutdown = await db.get_meta("clean_shutdown") == "1"
+        await db.set_meta("clean_shutdown", "0")
+        if not clean_shutdown:
+            logger.warning("Previous shutdown was not clean; re-syncing all sign-ups from Discord.")
+
+        loaded = 0
+        expired = []
+        for row in raids:
+            (raid_id, raid_name, channel_id_str, raid_type, start_timestamp, ping_timestamp, duration, tz,
+             roster_message_id) = row
+            ping_time_utc = datetime.fromtimestamp(ping_timestamp, tz=pytz.utc)
+            if ping_time_utc <= current_time:
+                logger.info(f"Ping time for raid {raid_id} '{raid_name}' has passed; removing record.")
+                expired.append((raid_id,))
+                self.journal.drop_raid(raid_id)
+                continue
+            if raid_type not in RAID_TYPES:
+                logger.error(f"Raid {raid_id} '{raid_name}' has unknown raid type {raid_type!r}; not loading it.")
                 continue
-            
-            # Initialize the active_raids entry so we can cache the Message
-            active_raids[raid_id] = {
-                "ping_task":  None,
-                "name":       raid_name,
-                "raid_type":  raid_type,
-                "channel_id": channel_id,
-                "message":    None
-                }
-            # Pre-populate the in-memory sign-ups cache for this raid_id
-            try:
-                # Fetch the original signup message
+            raid = Raid(raid_id, raid_name, raid_type, int(channel_id_str), start_timestamp, ping_timestamp, duration, tz,
+                        roster_message_id=roster_message_id)
+            registry.load(raid)
+            self.reminders.schedule(raid_id, start_timestamp)
+            # Serve the stored sign-ups right away; hydration only patches what looks stale
+            signups_cache[raid_id] = RaidSignups.from_mapping(raid.definition, stored.pop(raid_id, {}))
+            if clean_shutdown and raid_id in synced:
+                self._trusted_signups.add(raid_id)
+            self.hydrator.submit(raid_id, ping_timestamp)
+            loaded += 1
+
+        # Remove every expired raid under one commit
+        if expired:
+            await db.executemany("DELETE FROM active_raids WHERE raid_id = ?", expired)
+
+        logger.info(f"Loaded {loaded} raids from the database in {time.perf_counter() - started:.2f}s; "
+                    f"hydrating them in the background, nearest ping first.")
+        if loaded:
+            self._hydration_report = asyncio.create_task(self._report_hydration(loaded, started),
+                                                         name="hydration-report")
+
+    async def _report_hydration(self, loaded: int, started: float):
+        await self.hydrator.join()
+        timings, counters = self._hydration_timings, self.hydrator.counters
+        logger.info(
+            f"Hydrated {loaded} raids in {time.perf_counter() - started:.2f}s "
+            f"({counters['on_demand']} on first access, {counters['shared']} waits shared; "
+            f"channel {timings['channel']:.2f}s, message {timings['message']:.2f}s, "
+            f"reactions {timings['reactions']:.2f}s of REST time, concurrency {HYDRATION_CONCURRENCY})"
+        )
+        self._hydration_channels.clear()
+
+    async def _fetch_hydration_channel(self, channel_id: int):
+        channel = self.get_channel(channel_id)
+        if channel:
+            return channel
+        async with self._hydration_limiter:
+            phase_start = time.perf_counter()
+            channel = await self.fetch_channel(channel_id)
+            self._hydration_timings["channel"] += time.perf_counter() - phase_start
+        return channel
+
+    async def _hydrate_raid(self, raid_id: int):
+        """Hydrator callback: fetch a restored raid's message and bring its sign-ups up to date."""
+        raid = registry.get(raid_id)
+        if raid is None:
+            return
+        channel_id = raid.channel_id
+        stored = signups_cache.get(raid_id) or RaidSignups(raid.definition)
+        trusted = raid_id in self._trusted_signups
+        self._trusted_signups.discard(raid_id)
+        limiter, channel_tasks, timings = self._hydration_limiter, self._hydration_channels, self._hydration_timings
+        try:
+            if channel_id not in channel_tasks:
+                channel_tasks[channel_id] = asyncio.create_task(self._fetch_hydration_channel(channel_id))
+            channel = await channel_tasks[channel_id]
+        except Exception as e:
+            logger.warning(f"Could not fetch channel {channel_id} for raid {raid_id}: {e}")
+            return
+
+        try:
+            # Fetch the original signup message once; it is reused for every reaction page
+            async with limiter:
+                phase_start = time.perf_counter()
                 raid_message = await channel.fetch_message(raid_id)
-                # Store it back in the cache
-                active_raids[raid_id]["message"] = raid_message
-
-                # Build the reaction cache from the message’s existing reactions
-                cache: Dict[str, Set[int]] = {}
-                for reaction in raid_message.reactions:
-                    emoji = str(reaction.emoji)
-                    uid_set: Set[int] = set()
+                timings["message"] += time.perf_counter() - phase_start
+            # Store it back in the cache
+            raid.message = raid_message
+            if LIVE_ROSTER == "inline":
+                self.live_roster.seen(raid_id, raid_message.content)
+
+            # Build the reaction cache from the message’s existing reactions
+            async def collect(reaction) -> Tuple[str, Set[int]]:
+                uid_set: Set[int] = set()
+                async with limiter:
+                    phase_start = time.perf_counter()
+                    bots = 0
                     async for user in reaction.users():
                         if user.bot:
+                            bots += 1
                             continue
                         uid_set.add(user.id)
-                    cache[emoji] = uid_set
-
+                    timings["reactions"] += time.perf_counter() - phase_start
+                self._reaction_bots.setdefault(raid_id, {})[str(reaction.emoji)] = bots
+                return str(reaction.emoji), uid_set
+
+            # Foreign reactions are never stored; the pruner removes them
+            reactions = [r for r in raid_message.reactions if str(r.emoji) in raid.definition.allowed]
+
+            # Page only emoji whose reaction count disagrees with the stored set
+            if trusted:
+                stale = [r for r in reactions if self._signup_count(raid_id, r) != stored.count(str(r.emoji))]
+                present = {str(r.emoji) for r in reactions}
+                vanished = [emoji for emoji in stored.keys() if emoji not in present]
+                cache = stored
+            else:
+                stale, vanished = reactions, []
+                cache = RaidSignups(raid.definition)
+
+            fetched = await asyncio.gather(*map(collect, stale))
+            # Retired while we were fetching; storing now would resurrect its cache and rows
+            if raid_id not in registry:
+                return
+            # Stale counts can come from other bots' reactions alone; only real differences are written
+            changed = not trusted or bool(vanished)
+            for emoji in vanished:
+                cache.clear(emoji)
+            for emoji, uids in fetched:
+                if uids != set(cache.get(emoji)):
+                    cache.replace(emoji, uids)
+                    changed = True
+
+            if changed:
+                self.journal.replace_raid(raid_id, cache)
                 # Store into the global cache
                 signups_cache[raid_id] = cache
-                logger.info(f"Preloaded signups cache for raid {raid_id}")
-
-            except Exception as e:
-                logger.warning(f"Could not preload signups cache for raid {raid_id}: {e}")
-            ping_time_utc = datetime.fromtimestamp(ping_timestamp, tz=pytz.utc)
-            delay = (ping_time_utc - current_time).total_seconds()
-            
-            if delay > 0:
-                ping_task = asyncio.create_task(self.schedule_ping(delay, channel, raid_id))
-                active_raids[raid_id]["ping_task"] = ping_task
-                logger.info(f"Rescheduled ping for raid {raid_id} '{raid_name}' in {delay} seconds.")
+                rosters.drop(raid_id)
+                if self.recorder:
+                    self.recorder.signups_replaced(raid, cache)
+                logger.info(f"Preloaded signups cache for raid {raid_id} ({len(stale)} reactions fetched from Discord)")
             else:
-                logger.info(f"Ping time for raid {raid_id} '{raid_name}' has passed; removing record.")
-                await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+                logger.info(f"Loaded signups cache for raid {raid_id} from the database")
 
-    async def schedule_ping(self, delay: float, channel: discord.TextChannel, raid_id: int):
+        except Exception as e:
+            logger.warning(f"Could not preload signups cache for raid {raid_id}: {e}")
+        # Catch the roster up with reactions added while the bot was down
+        self.roster_changed(raid)
+
+    async def reconcile_raid(self, raid_id: int) -> int:
+        """Reconciler callback: re-page emoji whose reaction count disagrees with the cache."""
+        raid = registry.get(raid_id)
+        cache = signups_cache.get(raid_id)
+        # Raids still waiting for hydration are checked by it anyway
+        if raid is None or cache is None or self.hydrator.needs(raid_id):
+            return 0
+
+        channel = self.get_channel(raid.channel_id)
+        if channel is None:
+            await self.reconciler.pace()
+            channel = await self.fetch_channel(raid.channel_id)
+        await self.reconciler.pace()
+        message = await channel.fetch_message(raid_id)
+        raid.message = message
+
+        reactions = [r for r in message.reactions if str(r.emoji) in raid.definition.allowed]
+        stale = [r for r in reactions if self._signup_count(raid_id, r) != cache.count(str(r.emoji))]
+        present = {str(r.emoji) for r in reactions}
+        vanished = [emoji for emoji in cache.keys() if emoji not in present]
+        if not stale and not vanished:
+            return 0
+
+        corrected = 0
+        for reaction in stale:
+            emoji = str(reaction.emoji)
+            await self.reconciler.pace()
+            before = cache.count(emoji)
+            uids: Set[int] = set()
+            paged = bots = 0
+            async for user in reaction.users():
+                paged += 1
+                # Users come in pages of 100; the next page is requested once this one is used up
+                if paged % 100 == 0:
+                    await self.reconciler.pace()
+                if user.bot:
+                    bots += 1
+                else:
+                    uids.add(user.id)
+            # Reactions arrived while paging; leave this emoji to the next pass
+            if cache.count(emoji) != before or signups_cache.get(raid_id) is not cache:
+                continue
+            # Remembered so another bot's reaction doesn't make this emoji look stale again
+            self._reaction_bots.setdefault(raid_id, {})[emoji] = bots
+            if uids != set(cache.get(emoji)):
+                cache.replace(emoji, uids)
+                corrected += 1
+        # Retired while we were paging; don't write its rows back
+        if raid_id not in registry:
+            return 0
+        for emoji in vanished:
+            cache.clear(emoji)
+            corrected += 1
+
+        if corrected:
+            self.journal.replace_raid(raid_id, cache)
+            rosters.drop(raid_id)
+            if self.recorder:
+                self.recorder.signups_replaced(raid, cache)
+            self.roster_changed(raid)
+            logger.info(f"Reconciled raid {raid_id}: {corrected} emoji differed from Discord")
+        return corrected
+
+    def _signup_count(self, raid_id: int, reaction: discord.Reaction) -> int:
+        """Sign-ups a reaction's count implies, less the bots seen on it when it was last paged."""
+        bots = self._reaction_bots.get(raid_id, {}).get(str(reaction.emoji))
+        return reaction.count - (int(reaction.me) if bots is None else bots)
+
+    def roster_changed(self, raid: Raid):
+        """Schedule a debounced live roster update for a raid whose sign-ups changed."""
+        if self.live_roster:
+            self.live_roster.touch(raid.raid_id, raid.channel_id)
+
+    async def _render_live_roster(self, raid_id: int) -> Optional[str]:
+        """Live roster callback: the raid's roster message content, or None once the raid is gone."""
+        await self.hydrator.ensure(raid_id)
+        raid = registry.get(raid_id)
+        if raid is None:
+            return None
+        channel = self.get_channel(raid.channel_id) or await self.fetch_channel(raid.channel_id)
+        cache = signups_cache.get(raid_id) or RaidSignups(raid.definition)
+        lookup = None
+        if self.members is not None:
+            await self.members.resolve(channel.guild, {uid for _, uids in cache.items() for uid in uids})
+            lookup = functools.partial(self.members.get, channel.guild)
+        roster = rosters.get(raid_id, channel.guild, cache, lookup)
+        if LIVE_ROSTER == "inline":
+            # The announcement stays as posted; the roster gets whatever room is left
+            announcement = signup_content(raid)
+            room = MAX_MESSAGE_LENGTH - len(announcement) - 2
+            live = render_live_roster(raid.definition.roles, roster, max(room, 0))
+            # A template too long to leave room for even the header keeps the post as it was
+            return f"{announcement}\n\n{live}" if live else announcement
+        return render_live_roster(raid.definition.roles, roster)
+
+    async def _edit_live_roster(self, raid_id: int, content: str):
+        """Live roster callback: edit the signup post or its companion, posting the companion first if needed."""
+        raid = registry.get(raid_id)
+        if raid is None:
+            return
+        channel = self.get_channel(raid.channel_id) or await self.fetch_channel(raid.channel_id)
+        mentions = discord.AllowedMentions.none()
+        if LIVE_ROSTER != "inline" and raid.roster_message_id is None:
+            message = await channel.send(content, allowed_mentions=mentions)
+            registry.set_roster_message(raid_id, message.id)
+            return
         try:
-            # Wait until the 30‑minute warning is due
-            await asyncio.sleep(delay)
+            message = await channel.get_partial_message(raid.roster_message_id or raid_id).edit(
+                content=content, allowed_mentions=mentions)
+        except discord.NotFound:
+            if LIVE_ROSTER == "inline":
+                raise
+            # The companion was deleted; the next change posts a new one
+            logger.warning(f"Live roster message of raid {raid_id} is gone; it will be posted again.")
+            registry.set_roster_message(raid_id, None)
+            self.live_roster.forget(raid_id)
+            return
+        if LIVE_ROSTER == "inline":
+            raid.message = message
+
+    async def resolve_raid_message(self, channel_id: int, message_id: int) -> discord.Message:
+        """Return a raid's signup message, fetching and caching it on a cold cache."""
+        raid = registry.get(message_id)
+        # Use cached Message if available
+        msg = raid.message if raid else None
+        if not msg:
+            channel = self.get_channel(channel_id) or await self.fetch_channel(channel_id)
+            msg = await channel.fetch_message(message_id)
+            if raid:
+                raid.message = msg
+        return msg
+
+    async def send_reminder(self, raid_id: int, offset: int, final: bool, lateness: float):
+        """Scheduler callback: post a reminder and retire the raid after the final one."""
+        raid = registry.get(raid_id)
+        try:
+            if not raid:
+                return
+            channel = self.get_channel(raid.channel_id) or await self.fetch_channel(raid.channel_id)
 
             # Send the reminder
             if channel.id == TEST_CHANNEL_ID:
                 await channel.send("TEST MODE: reminder ping successfully simulated!")
-            else:
+            elif final:
                 await channel.send(
-                    f"{GUILD_MEMBER_PING} Raid starts in 30 minutes! Please join the raid VC, head to the guild house, and submit your deck to your team lead.")
-
-            # Purge in‑memory signups cache
-            signups_cache.pop(raid_id, None)
-
-            # Delete from the database
-            await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+                    f"{GUILD_MEMBER_PING} Raid starts in {format_offset(offset)}! Please join the raid VC, head to the guild house, and submit your deck to your team lead.")
+            else:
+                await channel.send(f"{GUILD_MEMBER_PING} Reminder: **{raid.name}** starts in {format_offset(offset)}.")
 
-            # Remove from the in‑memory active_raids map
-            if raid_id in active_raids:
-                del active_raids[raid_id]
+            if final:
+                await self.retire_raid(raid_id)
 
         except asyncio.CancelledError:
             logger.info(f"Scheduled ping for raid {raid_id} was cancelled.")
 
         except Exception as e:
-            logger.error(f"Error in schedule_ping for raid {raid_id}: {e}", exc_info=True)
-
-            # Ensure cache is also purged on errors
-            signups_cache.pop(raid_id, None)
+            logger.error(f"Error in send_reminder for raid {raid_id}: {e}", exc_info=True)
 
             # Cleanup DB and in‑memory state on failure
-            if raid_id in active_raids:
-                del active_raids[raid_id]
-            await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+            if final:
+                await self.retire_raid(raid_id)
+
+    async def retire_raid(self, raid_id: int):
+        """Drop a raid from the scheduler, the caches and the database."""
+        self.reminders.cancel(raid_id)
+        self.seeder.cancel(raid_id)
+        self.hydrator.discard(raid_id)
+        self._reaction_bots.pop(raid_id, None)
+
+        # Purge in‑memory signups cache and its stored rows
+        signups_cache.pop(raid_id, None)
+        rosters.drop(raid_id)
+        if self.live_roster:
+            self.live_roster.forget(raid_id)
+        self.journal.drop_raid(raid_id)
+
+        # Remove from the registry, which deletes the database row
+        registry.remove(raid_id)
+        if self.recorder:
+            self.recorder.raid_closed(raid_id)
 
     async def close(self):
         logger.info("Performing cleanup before shutdown...")
-        for raid_id in list(active_raids.keys()):
-            task = active_raids[raid_id]["ping_task"]
-            task.cancel()
-            try:
-                await task
-            except asyncio.CancelledError:
-                pass
+        await self.reminders.stop()
+        await self.pruner.stop()
+        await self.seeder.stop()
+        if self.live_roster:
+            await self.live_roster.stop()
+        await self.reconciler.stop()
+        await self.memory_budget.stop()
+        await self.hydrator.stop()
+        if self._hydration_report:
+            self._hydration_report.cancel()
+        await registry.stop()
+        # Stored sign-ups of raids never checked against Discord this session stay unvouched
+        unverified = [raid_id for raid_id in self.hydrator.queued() if raid_id not in self._trusted_signups]
+        try:
+            # Final flush, then vouch for the stored sign-ups on the next boot
+            await self.journal.stop()
+            if unverified:
+                logger.warning(f"{len(unverified)} raids were never hydrated; next startup re-syncs all sign-ups.")
+            else:
+                await db.set_meta("clean_shutdown", "1")
+        except Exception:
+            logger.exception("Could not flush the sign-up journal on shutdown")
         await db.close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        await self.loop_monitor.stop()
+        if self.recorder:
+            self.recorder.close()
         await super().close()
 
 bot = RaidBot()
@@ -153,12 +640,44 @@ bot = RaidBot()
 @bot.event
 async def on_ready():
     logger.info(f'Logged in as {bot.user} (ID: {bot.user.id})')
+    members = len(bot.members) if bot.members is not None else sum(len(g.members) for g in bot.guilds)
+    logger.info(f"Ready {time.perf_counter() - bot.started_at:.2f}s after start with member chunking "
+                f"{'on' if CHUNK_GUILD_MEMBERS else 'off'}: {members} members cached, "
+                f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.playing, name="Gatekeeper of the Apocalypse"))
+    # Reactions may have been missed while the gateway was down
+    bot.reconciler.trigger("ready")
+
+@bot.event
+async def on_resumed():
+    bot.reconciler.trigger("resumed")
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    # Nickname changes invalidate the cached display name and re-sort rosters
+    if before.display_name != after.display_name:
+        refresh_member_name(after)
+
+@bot.event
+async def on_user_update(before: discord.User, after: discord.User):
+    # Global name changes show up as display names for members without a nickname
+    if before.display_name != after.display_name:
+        name_cache.invalidate(after.id)
+        for guild in bot.guilds:
+            member = bot.members.get(guild, after.id) if bot.members is not None else guild.get_member(after.id)
+            if member:
+                rosters.on_member_update(member)
 
 @bot.event
 async def on_raw_reaction_add(payload):
+    if bot.recorder:
+        bot.recorder.reaction(payload, added=True)
+    with EVENT_SECONDS.time(event="on_raw_reaction_add"):
+        await handle_reaction_add(payload)
+
+async def handle_reaction_add(payload):
     # Quick exit if we don’t care about this message or if it’s from a bot
-    raid = active_raids.get(payload.message_id)
+    raid = registry.get(payload.message_id)
     if not raid or (payload.member and payload.member.bot):
         return
     
@@ -167,50 +686,56 @@ async def on_raw_reaction_add(payload):
         return
 
     emoji = str(payload.emoji)
-    allowed = set(RAID_REACTIONS[raid["raid_type"]])
-
-    if emoji not in allowed:
-        # Dispatch a non-blocking prune task and return immediately
-        asyncio.create_task(_prune_reaction(
-            channel_id=payload.channel_id,
-            message_id=payload.message_id,
-            emoji=emoji,
-            user_id=payload.user_id
-        ))
-        return
-
-    # Record valid reaction in cache
-    cache = signups_cache.setdefault(payload.message_id, {})
-    cache.setdefault(emoji, set()).add(payload.user_id)
 
+    if emoji not in raid.definition.allowed:
+        # Hand off to the coalescing pruner and return immediately
+        bot.pruner.submit(payload.channel_id, payload.message_id, emoji, payload.user_id)
+        return
 
-async def _prune_reaction(channel_id: int, message_id: int, emoji: str, user_id: int):
-    """Background task to remove one unauthorized reaction as fast as possible."""
-    raid = active_raids.get(message_id)
-    # Use cached Message if available
-    msg = raid.get("message") if raid else None
-    if not msg:
-        channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
-        msg = await channel.fetch_message(message_id)
-        if raid:
-            raid["message"] = msg
+    # Raids restored at startup are hydrated before their first sign-up is applied
+    if await bot.hydrator.ensure(payload.message_id) and payload.message_id not in registry:
+        return
 
-    try:
-        # Remove only that single emoji instance from the offending user
-        await msg.remove_reaction(emoji, discord.Object(id=user_id))
-    except Exception as e:
-        logger.warning(f"Could not prune reaction {emoji} on {message_id}: {e}")
+    # Record valid reaction in cache
+    signups = signups_cache.get(payload.message_id)
+    if signups is None:
+        signups = signups_cache[payload.message_id] = RaidSignups(raid.definition)
+    changed = signups.add(emoji, payload.user_id)
+    bot.journal.record_add(payload.message_id, emoji, payload.user_id)
+    if bot.members is not None and payload.member:
+        bot.members.remember(payload.member)
+    rosters.on_add(payload.message_id, emoji, payload.user_id, payload.member)
+    if changed:
+        bot.roster_changed(raid)
 
 @bot.event
 async def on_raw_reaction_remove(payload):
+    if bot.recorder:
+        bot.recorder.reaction(payload, added=False)
+    with EVENT_SECONDS.time(event="on_raw_reaction_remove"):
+        await handle_reaction_remove(payload)
+
+async def handle_reaction_remove(payload):
     try:
         # Keep cache in-sync on un-react
-        if payload.message_id in active_raids:
-            cache = signups_cache.get(payload.message_id, {})
-            cache.setdefault(str(payload.emoji), set()).discard(payload.user_id)
+        if payload.message_id in registry:
+            await bot.hydrator.ensure(payload.message_id)
+            signups = signups_cache.get(payload.message_id)
+            changed = signups is not None and signups.discard(str(payload.emoji), payload.user_id)
+            bot.journal.record_remove(payload.message_id, str(payload.emoji), payload.user_id)
+            bot.pruner.withdraw(payload.message_id, str(payload.emoji), payload.user_id)
+            rosters.on_remove(payload.message_id, str(payload.emoji), payload.user_id)
+            raid = registry.get(payload.message_id)
+            if changed and raid:
+                bot.roster_changed(raid)
     except Exception:
         logger.exception("Error in on_raw_reaction_remove")
 
+@bot.event
+async def on_interaction(interaction: discord.Interaction):
+    if bot.recorder:
+        bot.recorder.interaction(interaction)
+
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: Exception):
     logger.error(f"Error in `{interaction.command}` by {interaction.user}", exc_info=error)
@@ -237,6 +762,45 @@ class RaidSelect(Select):
         await interaction.edit_original_response(view=None)
         self.view.stop()
 
+async def raid_autocomplete(interaction: Interaction, current: str) -> List[app_commands.Choice[str]]:
+    # Discord shows at most 25 choices, each name at most 100 characters
+    return [app_commands.Choice(name=f"{raid.name} — {raid.start_label}"[:100], value=str(raid.raid_id))
+            for raid in registry.search(current, limit=25)]
+
+def resolve_raid_argument(text: str) -> Optional[Raid]:
+    """The raid picked from autocomplete (sent as its id), else the one named exactly so, else the only match."""
+    if text.isdecimal() and int(text) in registry:
+        return registry.get(int(text))
+    # A full name that is also the prefix of another raid's name still picks that raid
+    name = text.strip().casefold()
+    exact = [r for r in registry if r.name.casefold() == name]
+    if len(exact) == 1:
+        return exact[0]
+    matches = registry.search(text, limit=2)
+    return matches[0] if len(matches) == 1 else None
+
+async def choose_raid(interaction: Interaction, raid: Optional[str], prompt: str, placeholder: str,
+                      timeout: float = 60) -> Optional[int]:
+    """Raid id from the `raid` argument, or picked from a dropdown when it was left out."""
+    if raid is not None:
+        picked = resolve_raid_argument(raid)
+        if picked is None:
+            await interaction.followup.send(f"No single active raid matches \"{raid}\".", ephemeral=True)
+            return None
+        return picked.raid_id
+
+    # Active raids come from the in-memory registry; a select menu holds at most 25
+    raids = [(r.raid_id, r.name) for r in registry.newest_first()[:25]]
+    if not raids:
+        await interaction.followup.send("There are no active raids.", ephemeral=True)
+        return None
+    view = View(timeout=timeout)
+    selector = RaidSelect(raids, placeholder=placeholder)
+    view.add_item(selector)
+    await interaction.followup.send(prompt, view=view, ephemeral=True)
+    await view.wait()
+    return selector.selected_raid
+
 # /createraid command
 @permission_check
 @bot.tree.command(name="createraid", description="Create a new raid")
@@ -266,110 +830,56 @@ async def create_raid(interaction: Interaction, raid_name: str):
 
 
 
-    # Build the timestamp tag for Discord
-    ts_tag = f"<t:{flow._start_ts}:F>"
-
-    # Render the announcement content from the template
-    content = RAID_TEMPLATES[flow.raid_type].format(
+    # The raid is known by its signup post's id, assigned once the post is sent
+    raid = Raid(
+        raid_id=0,
         name=flow.raid_name,
-        timestamp=ts_tag,
+        raid_type=flow.raid_type,
+        channel_id=channel.id,
+        start_ts=flow._start_ts,
+        ping_ts=flow._ping_ts,
         duration=flow.duration,
-        GUILD_MEMBER_PING=get_ping_mention(interaction.channel.id)
+        tz=flow.tz
     )
 
     # Send the signup announcement
-    signup_msg = await channel.send(content)
-
-    # Start tracking this raid
-    signups_cache[signup_msg.id] = {}
-    active_raids[signup_msg.id] = {
-        "ping_task": None,
-        "name": flow.raid_name,
-        "raid_type": flow.raid_type,
-        "channel_id": channel.id,
-        "message": signup_msg
-    }
-
-    # Add reactions sequentially while handling Discord's 20-reaction limit
-    allowed = set(RAID_REACTIONS[flow.raid_type])
+    signup_msg = await channel.send(signup_content(raid))
 
-    cache = signups_cache.get(signup_msg.id, {})
+    # Start tracking this raid; the registry persists it for scheduling and recovery
+    raid.raid_id, raid.message = signup_msg.id, signup_msg
+    signups_cache[signup_msg.id] = RaidSignups(raid.definition)
+    registry.add(raid)
+    if bot.recorder:
+        bot.recorder.raid_opened(raid)
 
-    for emoji in RAID_REACTIONS[flow.raid_type]:
-        # Remove any user reaction so bot’s is first
-        if cache.get(emoji):
-            await signup_msg.clear_reaction(emoji)
+    # Queue the reminders; an overdue final ping fires right away
+    bot.reminders.schedule(signup_msg.id, flow._start_ts)
+    # Shows the (empty) roster in the post, or posts its companion message
+    bot.roster_changed(raid)
 
-        try:
-            await signup_msg.add_reaction(emoji)
-        except discord.Forbidden:
-            logger.warning("Max unique reactions reached; pruning unauthorized emojis")
-            # Fetch fresh message state
-            message = await signup_msg.channel.fetch_message(signup_msg.id)
-            # Remove each reaction not in our allowed set
-            for reaction in message.reactions:
-                if str(reaction.emoji) not in allowed:
-                    await signup_msg.clear_reaction(reaction.emoji)
-            # Retry adding only this emoji
-            await signup_msg.add_reaction(emoji)
-
-    # Persist the new raid into the database for scheduling and recovery
-    await db.execute(
-        """
-        INSERT INTO active_raids
-          (raid_id, raid_name, channel_id, raid_type, start_timestamp,
-           ping_timestamp, duration, tz)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            signup_msg.id,
-            flow.raid_name,
-            channel.id,
-            flow.raid_type,
-            flow._start_ts,
-            flow._ping_ts,
-            flow.duration,
-            flow.tz
-        )
-    )
-
-    # Schedule the 30-minute reminder task
-    delay = flow._ping_ts - int(datetime.now(pytz.utc).timestamp())
-    ping_task = asyncio.create_task(bot.schedule_ping(delay, channel, signup_msg.id))
-    # Track the task in memory for possible cancellation
-    active_raids[signup_msg.id]["ping_task"] = ping_task
+    # Seed the sign-up reactions in the background; the post is usable already
+    bot.seeder.seed(signup_msg, raid.definition.emojis)
 
 # /updateraid command
 @permission_check
 @bot.tree.command(name="updateraid", description="Update or reschedule an active raid")
-async def update_raid(interaction: Interaction):
+@app_commands.describe(raid="Raid to update; leave empty to pick from a list")
+@app_commands.autocomplete(raid=raid_autocomplete)
+async def update_raid(interaction: Interaction, raid: Optional[str] = None):
     await interaction.response.defer(ephemeral=True)
 
-    # Build choices from the in-memory cache
-    raids = [(raid_id, info["name"]) for raid_id, info in active_raids.items()]
-    if not raids:
-        return await interaction.followup.send("There are no active raids.", ephemeral=True)
-
-    # Prompt user to select which raid to update
-    selector_view = View(timeout=60)
-    selector_view.add_item(RaidSelect(raids=raids, placeholder="Select raid to update…"))
-    await interaction.followup.send("Choose a raid to update:", view=selector_view, ephemeral=True)
-    await selector_view.wait()
-
-    raid_id = selector_view.children[0].selected_raid
+    # Prompt user to select which raid to update, unless it was given
+    raid_id = await choose_raid(interaction, raid, "Choose a raid to update:", "Select raid to update…")
     if raid_id is None:
         return  # user timed out or cancelled
 
-    # Fetch full raid details in one DB call
-    row = await db.fetchone(
-        "SELECT raid_id, raid_name, channel_id, raid_type, start_timestamp, duration, tz "
-        "FROM active_raids WHERE raid_id = ?",
-        (raid_id,)
-    )
-    if not row:
-        return await interaction.followup.send("Raid not found in database.", ephemeral=True)
+    # Full raid details come from the registry
+    raid = registry.get(raid_id)
+    if not raid:
+        return await interaction.followup.send("Raid not found.", ephemeral=True)
 
-    raid_id, raid_name, channel_id, raid_type, start_ts, duration, tz_code = row
+    raid_name, channel_id, raid_type = raid.name, raid.channel_id, raid.raid_type
+    start_ts, duration, tz_code = raid.start_ts, raid.duration, raid.tz
 
     # Convert stored UTC timestamp into user's local time
     user_tz = pytz.timezone(TIMEZONE_MAPPING[tz_code])
@@ -399,97 +909,50 @@ async def update_raid(interaction: Interaction):
     localized = user_tz.localize(combined, is_dst=None)
     new_utc   = localized.astimezone(pytz.utc)
     new_start = int(new_utc.timestamp())
-    new_ping  = new_start - 30 * 60  # 30 minutes before start
+    new_ping  = new_start - min(REMINDER_OFFSETS)  # final reminder before start
 
     # Attempt to update the sign-up post
     signup_post = await fetch_signup_post(bot, channel_id, raid_id)
     if signup_post:
-        ts_tag = f"<t:{new_start}:F>"
-        new_content = RAID_TEMPLATES[flow.raid_type].format(
-            name=raid_name,
-            timestamp=ts_tag,
-            duration=flow.duration,
-            GUILD_MEMBER_PING=get_ping_mention(channel_id)
-        )
+        new_content = signup_content(replace(raid, start_ts=new_start, duration=flow.duration))
         await edit_signup_post(signup_post, new_content, interaction)
 
-    # Persist the updated schedule
-    await db.execute(
-        "UPDATE active_raids "
-        "SET start_timestamp = ?, ping_timestamp = ?, duration = ?, tz = ? "
-        "WHERE raid_id = ?",
-        (new_start, new_ping, flow.duration, flow.tz, raid_id)
-    )
-
-    # Cancel the old ping and reschedule
-    old = active_raids.pop(raid_id, None)
-    if old and old.get("ping_task"):
-        old["ping_task"].cancel()
-
-    channel = signup_post.channel if signup_post else (
-        bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
-    )
+    # Persist the updated schedule and move the raid's reminders in the scheduler heap
     delay = (datetime.fromtimestamp(new_ping, pytz.utc) - datetime.now(pytz.utc)).total_seconds()
-    if delay > 0:
-        task = asyncio.create_task(bot.schedule_ping(delay, channel, raid_id))
-        active_raids[raid_id] = {
-            "ping_task": task,
-            "name":      raid_name,
-            "raid_type": flow.raid_type,
-            "channel_id": channel_id,
-            "message":   old.get("message")
-        }
+    if delay > 0 and raid_id in registry:
+        registry.reschedule(raid_id, new_start, new_ping, flow.duration, flow.tz)
+        if signup_post:
+            raid.message = signup_post
+        bot.reminders.schedule(raid_id, new_start)
+        # The edit above replaced an inline roster; put it back
+        if bot.live_roster:
+            bot.live_roster.forget(raid_id)
+        bot.roster_changed(raid)
     else:
-        await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+        await bot.retire_raid(raid_id)
 
     await interaction.followup.send("Raid updated successfully.", ephemeral=True)
 
 # /cancelraid command
 @permission_check
 @bot.tree.command(name="cancelraid", description="Cancel an active raid")
-async def cancel_raid(interaction: Interaction):
+@app_commands.describe(raid="Raid to cancel; leave empty to pick from a list")
+@app_commands.autocomplete(raid=raid_autocomplete)
+async def cancel_raid(interaction: Interaction, raid: Optional[str] = None):
     await interaction.response.defer(ephemeral=True)
 
-    # Load active raids
-    raids = await db.fetchall("""
-        SELECT raid_id, raid_name
-        FROM active_raids
-        ORDER BY raid_id DESC
-    """)
-    if not raids:
-        return await interaction.followup.send("There are no active raids.", ephemeral=True)
-
-    # Show dropdown
-    view = View(timeout=60)
-    view.add_item(RaidSelect(raids, placeholder="Select raid to cancel…"))
-    await interaction.followup.send("Select a raid to cancel:", view=view, ephemeral=True)
-    await view.wait()
-
     # Which one did they pick?
-    selector: RaidSelect = view.children[0]
-    raid_id = selector.selected_raid
+    raid_id = await choose_raid(interaction, raid, "Select a raid to cancel:", "Select raid to cancel…")
     if raid_id is None:
         return
 
-    # Get channel_id before deleting from DB
-    row = await db.fetchone(
-        "SELECT channel_id FROM active_raids WHERE raid_id = ?",
-        (raid_id,)
-    )
-    channel_id = int(row[0]) if row else None
+    # Get channel_id (and the live roster's companion) before dropping the raid
+    raid = registry.get(raid_id)
+    channel_id = raid.channel_id if raid else None
+    roster_message_id = raid.roster_message_id if raid else None
 
-    # Cancel in‐memory task & caches
-    info = active_raids.pop(raid_id, None)
-    if info and info.get("ping_task"):
-        info["ping_task"].cancel()
-        try:
-            await info["ping_task"]
-        except asyncio.CancelledError:
-            pass
-    signups_cache.pop(raid_id, None)
-
-    # Delete from database
-    await db.execute("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+    # Cancel reminders, caches and the database record
+    await bot.retire_raid(raid_id)
 
     # Try to delete the original announcement
     if channel_id:
@@ -497,6 +960,8 @@ async def cancel_raid(interaction: Interaction):
             channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
             msg = await channel.fetch_message(raid_id)
             await msg.delete()
+            if roster_message_id:
+                await channel.get_partial_message(roster_message_id).delete()
         except discord.NotFound:
             logger.warning(f"Message {raid_id} already deleted")
         except Exception as e:
@@ -507,79 +972,83 @@ async def cancel_raid(interaction: Interaction):
 # /showsignups command
 @permission_check
 @bot.tree.command(name="showsignups", description="Show sign-ups for an active raid")
-async def showsignups(interaction: Interaction):
+@app_commands.describe(raid="Raid to show; leave empty to pick from a list")
+@app_commands.autocomplete(raid=raid_autocomplete)
+async def showsignups(interaction: Interaction, raid: Optional[str] = None):
     await interaction.response.defer(ephemeral=True)
     logger.info(f"Sign-ups requested by {interaction.user.display_name}")
 
-    # Fetch active raids from the database
-    raids = await db.fetchall(
-        "SELECT raid_id, raid_name, channel_id, raid_type FROM active_raids ORDER BY raid_id DESC"
-    )
-    if not raids:
-        await interaction.followup.send("There are no active raids.", ephemeral=True)
-        return
-
-    # Present a dropdown for the user to select a raid
-    options = [(r_id, name) for r_id, name, _, _ in raids]
-    selector = RaidSelect(options, placeholder="Select raid to view sign-ups…")
-    view = View(timeout=30)
-    view.add_item(selector)
-    await interaction.followup.send("Select a raid to view sign-ups:", view=view, ephemeral=True)
-    await view.wait()
+    # Present a dropdown for the user to select a raid, unless it was given
+    raid_id = await choose_raid(interaction, raid, "Select a raid to view sign-ups:",
+                                "Select raid to view sign-ups…", timeout=30)
 
     # Abort if the user did not select anything
-    raid_id = selector.selected_raid
     if raid_id is None:
         return
 
     # Load raid metadata and in-memory cache
-    _, raid_name, _, raid_type = next(r for r in raids if r[0] == raid_id)
-    mapping = SIGNUP_MAPPINGS[raid_type]
-    cache = signups_cache.get(raid_id, {})
+    raid = registry.get(raid_id)
+    if not raid:
+        return await interaction.followup.send("That raid is no longer active.", ephemeral=True)
+    raid_name = raid.name
+    await bot.hydrator.ensure(raid_id)
+    cache = signups_cache.get(raid_id) or RaidSignups(raid.definition)
     guild = interaction.guild or await bot.fetch_guild(interaction.guild_id)
 
-    # Build blocks so each section stays intact
-    blocks: List[str] = []
-
-    # Title
-    blocks.append(f"**{raid_name}**")
-
-    # Roles header
-    blocks.append("\n__**Roles**__")
-
-    # One block per role
-    for emoji, role_desc in mapping["roles"].items():
-        if emoji == "↪️":
-            blocks.append("")  # blank line before backups
-        members    = get_sorted_display_names(cache.get(emoji, set()), guild) or ["None"]
-        member_list = ", ".join(members)
-        blocks.append(f"{emoji} {role_desc}\n{member_list}")
-
-    # Full roster & count
-    all_members = get_sorted_display_names(set().union(*cache.values()), guild) or ["None"]
-    blocks.append(f"\n__**Full Roster**__\n{', '.join(all_members)}")
-    blocks.append(f"\n**Number of Sign-ups:** {len(all_members)}")
+    # The sorted roster index is kept up to date by the reaction handlers
+    lookup = None
+    if bot.members is not None:
+        # No member cache; request just the members signed up for this raid
+        await bot.members.resolve(guild, {uid for _, uids in cache.items() for uid in uids})
+        lookup = functools.partial(bot.members.get, guild)
+    roster = rosters.get(raid_id, guild, cache, lookup)
+    blocks = render_signups(raid_name, raid.definition.roles, roster)
 
     # Flush loop
-    MAX_MESSAGE_LENGTH = 2000
-    buffer = ""
-    for block in blocks:
-        chunk = block + "\n"
-        if len(buffer) + len(chunk) > MAX_MESSAGE_LENGTH:
-            await interaction.followup.send(
-                buffer.rstrip(),
-                ephemeral=True,
-                allowed_mentions=discord.AllowedMentions.none()
-            )
-            buffer = ""
-        buffer += chunk
-
-    if buffer:
+    for content in chunk_blocks(blocks):
         await interaction.followup.send(
-            buffer.rstrip(),
+            content,
             ephemeral=True,
             allowed_mentions=discord.AllowedMentions.none()
         )
 
+# /botdebug diagnostics
+# Hidden from everyone but administrators; admin_check enforces it if a server overrides that
+botdebug = app_commands.Group(name="botdebug", description="Bot diagnostics",
+                              default_permissions=discord.Permissions(administrator=True))
+
+@botdebug.command(name="caches", description="Show each cache's size and share of the memory budget")
+@admin_check
+async def botdebug_caches(interaction: Interaction):
+    budget = bot.memory_budget
+    lines = [f"{'cache':22} {'entries':>8} {'limit':>8} {'est. MB':>8} {'share':>6}"]
+    for row in budget.stats():
+        limit = row["limit"] if row["limit"] is not None else "-"
+        evictable = "" if row["evictable"] else " (pinned)"
+        lines.append(f"{row['cache']:22} {row['entries']:>8} {limit:>8} {row['bytes'] / MB:>8.1f} "
+                     f"{row['share']:>6.1%}{evictable}")
+    if budget.budget:
+        lines.append(f"\nBudget {budget.budget / MB:.0f} MB, estimated use {budget.usage() / MB:.0f} MB; "
+                     f"{budget.evictions} entries evicted in {budget.pressure_events} pressure events")
+    else:
+        lines.append("\nNo memory budget set (MEMORY_BUDGET_MB); shares are of all caches")
+    lines.append(f"RSS {rss_bytes() / MB:.0f} MB, {len(registry)} active raids")
+    content = "```\n" + "\n".join(lines) + "\n```"
+    await interaction.response.send_message(content, ephemeral=True)
+
+@botdebug.command(name="memory", description="Show allocation growth since startup and memory by component")
+@admin_check
+async def botdebug_memory(interaction: Interaction):
+    await interaction.response.defer(ephemeral=True)
+    for content in chunk_blocks(["```"] + (await bot.memory_report()).splitlines() + ["```"], MAX_MESSAGE_LENGTH - 8):
+        if not content.startswith("```"):
+            content = "```\n" + content
+        if not content.endswith("```"):
+            content += "\n```"
+        await interaction.followup.send(content, ephemeral=True)
+
+bot.tree.add_command(botdebug)
+
 if __name__ == "__main__":
+    install_event_loop(USE_UVLOOP)
     bot.run(TOKEN)
\ No newline at end of file
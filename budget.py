@@ -0,0 +1,138 @@
+import asyncio, gc, logging, os, resource
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MB = 2**20
+
+
+def rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class CacheAccount:
+    name: str
+    # Current number of entries
+    entries: Callable[[], int]
+    # Approximate bytes per entry, measured with tracemalloc
+    entry_bytes: int
+    # Fraction of the cache budget this cache may use
+    share: float
+    # Drops up to n least recently used entries and returns how many went; None if not evictable
+    evict: Optional[Callable[[int], int]] = None
+    # Applies an entry limit to the cache itself
+    resize: Optional[Callable[[int], None]] = None
+
+    def used(self) -> int:
+        return self.entries() * self.entry_bytes
+
+
+class MemoryBudget:
+    """
+    Splits one memory budget between the bot's caches and keeps them inside it.
+
+    Half of the budget is set aside for everything not tracked here (the
+    interpreter, discord.py's guild and channel state, aiohttp buffers,
+    fragmentation); the other half is divided between the registered caches
+    by their share, and caches with a size limit get one derived from it.
+    Every `interval` seconds the estimated usage is checked, and once it
+    passes HIGH_WATER of the budget the evictable caches drop their least
+    recently used entries until it is back under LOW_WATER. Caches holding
+    data that cannot be refetched cheaply (sign-ups) count toward the usage
+    but are never evicted. Without a budget the caches are only accounted
+    for, so their sizes can still be reported.
+    """
+
+    UNTRACKED_SHARE = 0.5
+    HIGH_WATER = 0.9
+    LOW_WATER = 0.75
+
+    def __init__(self, budget_mb: Optional[float], interval: float = 30.0):
+        self.budget = int(budget_mb * MB) if budget_mb else 0
+        self.interval = interval
+        self.accounts: Dict[str, CacheAccount] = {}
+        self.limits: Dict[str, Optional[int]] = {}
+        self.evictions = 0
+        self.pressure_events = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def cache_budget(self) -> int:
+        return int(self.budget * (1 - self.UNTRACKED_SHARE))
+
+    def add(self, account: CacheAccount) -> Optional[int]:
+        """Register a cache and return its entry limit (None without a budget)."""
+        limit = None
+        if self.budget:
+            limit = max(1, int(self.cache_budget * account.share / account.entry_bytes))
+            if account.resize:
+                account.resize(limit)
+        self.accounts[account.name] = account
+        self.limits[account.name] = limit
+        return limit
+
+    def usage(self) -> int:
+        """Estimated bytes: the untracked reserve plus every cache's entries."""
+        return self.budget - self.cache_budget + sum(a.used() for a in self.accounts.values())
+
+    def start(self):
+        if self.budget and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="memory-budget")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.enforce()
+
+    def enforce(self) -> int:
+        """Trim caches over their own limit, then shed LRU entries if the budget is nearly used."""
+        evicted = 0
+        for name, account in self.accounts.items():
+            over = account.entries() - (self.limits[name] or 0)
+            if self.budget and account.evict and over > 0:
+                evicted += account.evict(over)
+
+        usage = self.usage()
+        if self.budget and usage > self.budget * self.HIGH_WATER:
+            self.pressure_events += 1
+            excess = usage - int(self.budget * self.LOW_WATER)
+            evictable = [a for a in self.accounts.values() if a.evict and a.entries()]
+            held = sum(a.used() for a in evictable)
+            # Each evictable cache gives up its proportional part of the excess
+            for account in evictable:
+                part = excess * account.used() / held if held else 0
+                evicted += account.evict(min(account.entries(), -(-int(part) // account.entry_bytes)))
+            gc.collect()
+            logger.warning(f"Memory budget nearly used ({usage / MB:.0f} of {self.budget / MB:.0f} MB "
+                           f"estimated, RSS {rss_bytes() / MB:.0f} MB); evicted {evicted} cache entries.")
+        self.evictions += evicted
+        return evicted
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Per cache: entries, limit, estimated bytes and their share of the budget (or of all caches)."""
+        used = {name: account.used() for name, account in self.accounts.items()}
+        whole = self.budget or sum(used.values())
+        return [{
+            "cache": name,
+            "entries": account.entries(),
+            "limit": self.limits[name],
+            "bytes": used[name],
+            "share": used[name] / whole if whole else 0.0,
+            "evictable": account.evict is not None,
+        } for name, account in self.accounts.items()]
@@ -3,6 +3,112 @@ RAID_CAPTAIN_ROLE_ID = 1227986507260891216
 GUILD_MEMBER_PING = f"<@&1058291622439292958>"
 TEST_CHANNEL_ID = 1366161275297464410
 
+# Seconds before raid start at which reminders are sent; the smallest one is the
+# final ping that also retires the raid (e.g. (24 * 3600, 3600, 30 * 60)).
+REMINDER_OFFSETS = (30 * 60,)
+
+# Maximum Discord REST calls in flight while raids are hydrated at startup.
+# discord.py still enforces per-route buckets; this keeps startup off the global limit.
+HYDRATION_CONCURRENCY = 8
+
+# Raids restored at startup are hydrated in the background, nearest ping first,
+# by this many workers; a raid needed earlier is hydrated on first access.
+HYDRATION_WORKERS = 2
+
+# Anti-entropy pass that compares cached sign-ups with Discord's reaction counts:
+# seconds between timed passes (one also runs after every gateway connect or
+# resume), and the minimum seconds between its REST calls.
+RECONCILE_INTERVAL = 1800
+RECONCILE_REQUEST_INTERVAL = 2.0
+
+# Sign-up journal: how often pending reactions are written to SQLite (ms),
+# and how often rows of retired raids are purged (seconds).
+SIGNUP_FLUSH_MS = 250
+SIGNUP_COMPACT_INTERVAL = 3600
+
+# Disallowed-reaction pruner: concurrent workers, users on one bad emoji before
+# switching to a single clear_reaction, and queue bound before new prunes are dropped.
+PRUNE_WORKERS = 2
+PRUNE_CLEAR_THRESHOLD = 5
+PRUNE_MAX_PENDING = 2000
+
+# Seconds between reaction requests when seeding a new signup post, matching
+# Discord's per-channel reaction bucket so seeding never has to back off on 429s.
+REACTION_SEED_INTERVAL = 0.25
+
+# Users whose escaped display name and sort key are cached for roster renders
+NAME_CACHE_SIZE = 5000
+
+# Chunk the whole guild's member list at startup (discord.py's default). False
+# keeps no member cache: the members of a raid's sign-ups are requested on demand,
+# 100 per gateway request, and held for MEMBER_CACHE_TTL seconds in an LRU of at
+# most MEMBER_CACHE_SIZE users.
+CHUNK_GUILD_MEMBERS = True
+MEMBER_CACHE_SIZE = 5000
+MEMBER_CACHE_TTL = 3600
+
+# Memory budget for the whole process (MB), e.g. the Fly machine's 256. Half is
+# split between the bot's caches, sizing them (overriding NAME_CACHE_SIZE and
+# MEMBER_CACHE_SIZE) and evicting least recently used entries when the estimate
+# nears the budget. None keeps the fixed sizes above with no eviction.
+MEMORY_BUDGET_MB = None
+
+# Trace allocations with tracemalloc from startup, so /botdebug memory and
+# GET /debug/memory (with DEBUG_TOKEN set in the environment) can diff against a
+# baseline taken once the persistent raids are loaded. Tracing costs memory and
+# CPU; when off, the first report starts it and takes the baseline then.
+MEMORY_PROFILING = False
+
+# Live roster kept up to date from the sign-up reactions: None (off), "inline"
+# (appended to the signup post, trimmed to fit its 2000 characters) or
+# "companion" (a separate message posted below it). Changes are coalesced until
+# a channel has been quiet for ROSTER_EDIT_DELAY seconds, at most
+# ROSTER_EDIT_MAX_DELAY after the first one, and edits in a channel are spaced
+# ROSTER_EDIT_INTERVAL seconds apart to stay inside Discord's edit rate limit.
+LIVE_ROSTER = None
+ROSTER_EDIT_DELAY = 2.0
+ROSTER_EDIT_MAX_DELAY = 10.0
+ROSTER_EDIT_INTERVAL = 1.5
+
+# In-process Prometheus endpoint (GET /metrics); fly.toml routes internal_port 8080 here.
+# Set METRICS_PORT to None to disable it.
+METRICS_HOST = "0.0.0.0"
+METRICS_PORT = 8080
+
+# Event-loop monitor: heartbeat interval, and the lag at which the blocking
+# coroutine is captured and logged (both ms).
+LOOP_MONITOR_INTERVAL_MS = 100
+LOOP_LAG_THRESHOLD_MS = 250
+
+# Run on uvloop instead of the default asyncio event loop (needs uvloop installed).
+USE_UVLOOP = False
+
+# Append the reaction and interaction events the bot handles to this file for
+# offline replay (benchmarks/replay.py); None disables recording.
+EVENT_RECORD_PATH = None
+
+# Slash commands are only re-synced with Discord when the command tree's hash
+# differs from the one stored at the last sync. True (or FORCE_COMMAND_SYNC=1 in
+# the environment) syncs on every startup regardless.
+FORCE_COMMAND_SYNC = False
+
+# Opt-in group commit: single-statement writes arriving within this many ms
+# share one commit/fsync. 0 commits every write immediately.
+DB_GROUP_COMMIT_MS = 0
+
+# SQLite engine profile applied as PRAGMAs on every connection. WAL also enables
+# a separate read-only connection so list queries never queue behind writes.
+# Set to {} to run with SQLite's defaults.
+DB_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous":  "NORMAL",
+    "mmap_size":    32 * 1024 * 1024,
+    "cache_size":   -4096,  # negative = KiB
+}
+# Prepared statements cached per connection (keyed by SQL text). Never set this
+# below sqlite3's own default of 128, which would shrink the cache rather than grow it.
+DB_STATEMENT_CACHE = 256
+
 TIMEZONE_MAPPING = {
     "AT": "America/Anchorage",
     "PT": "America/Los_Angeles",
@@ -1,5 +1,12 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
 import aiosqlite
 
+from config import DB_GROUP_COMMIT_MS, DB_PROFILE, DB_STATEMENT_CACHE
+from metrics import DB_QUERY_SECONDS
+
 # Database manager using aiosqlite
 class DBManager:
     EXPECTED_COLUMNS = {
@@ -11,14 +18,30 @@ class DBManager:
         "ping_timestamp":  "INTEGER",
         "duration":        "TEXT",
         "tz":              "TEXT",
+        "signups_synced":  "INTEGER DEFAULT 0",
+        "roster_message_id": "INTEGER",
     }
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, group_commit_ms: int = 0,
+                 profile: Optional[Dict[str, object]] = None, statement_cache: int = 128):
         self.db_path = db_path
         self.conn = None
+        # Separate read-only connection, used when the profile enables WAL
+        self.read_conn = None
+        # PRAGMAs applied to every connection (journal_mode only on the writer)
+        self.profile = dict(profile or {})
+        # sqlite3 keeps this many prepared statements per connection, keyed by SQL text
+        self.statement_cache = statement_cache
+        # Group commit: writes arriving within this window share one commit (0 = off)
+        self.group_commit_window = group_commit_ms / 1000
+        self._write_lock = asyncio.Lock()
+        self._commit_waiter: Optional[asyncio.Future] = None
+        self._group_task: Optional[asyncio.Task] = None
+        self.group_commits = 0
 
     async def initialize(self):
-        self.conn = await aiosqlite.connect(self.db_path)
+        self.conn = await aiosqlite.connect(self.db_path, cached_statements=self.statement_cache)
+        await self._apply_profile(self.conn, writer=True)
         cols = ",\n    ".join(f"{n} {d}" for n, d in self.EXPECTED_COLUMNS.items())
         await self.conn.execute(f"""
         CREATE TABLE IF NOT EXISTS active_raids (
@@ -30,24 +53,146 @@ class DBManager:
         for col, col_def in self.EXPECTED_COLUMNS.items():
             if col not in existing:
                 await self.conn.execute(f"ALTER TABLE active_raids ADD COLUMN {col} {col_def}")
+        # Sign-ups persisted from the reaction journal; the primary key doubles as the raid index
+        await self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS signups (
+            raid_id INTEGER NOT NULL,
+            emoji   TEXT    NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (raid_id, emoji, user_id)
+        ) WITHOUT ROWID;
+        """)
+        await self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS bot_meta (
+            key   TEXT PRIMARY KEY,
+            value TEXT
+        );
+        """)
         await self.conn.commit()
 
+        # With WAL, readers never block on (or behind) the writer's worker thread
+        if str(self.profile.get("journal_mode", "")).upper() == "WAL":
+            self.read_conn = await aiosqlite.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, cached_statements=self.statement_cache)
+            await self._apply_profile(self.read_conn, writer=False)
+
+    async def _apply_profile(self, conn: aiosqlite.Connection, writer: bool):
+        for pragma, value in self.profile.items():
+            if pragma == "journal_mode" and not writer:
+                continue
+            await conn.execute(f"PRAGMA {pragma} = {value}")
+        if not writer:
+            await conn.execute("PRAGMA query_only = ON")
+
+    def _reader(self) -> aiosqlite.Connection:
+        # Writes waiting on a group commit are only visible to the writer connection
+        if self.read_conn is None or self._commit_waiter is not None:
+            return self.conn
+        return self.read_conn
+
     async def fetchall(self, query: str, params: tuple = ()):
-        async with self.conn.execute(query, params) as c:
-            return await c.fetchall()
+        with DB_QUERY_SECONDS.time(operation="fetchall"):
+            async with self._reader().execute(query, params) as c:
+                return await c.fetchall()
 
     async def fetchone(self, query: str, params: tuple = ()):
-        async with self.conn.execute(query, params) as c:
-            return await c.fetchone()
+        with DB_QUERY_SECONDS.time(operation="fetchone"):
+            async with self._reader().execute(query, params) as c:
+                return await c.fetchone()
 
     async def execute(self, query: str, params: tuple = ()):
-        await self.conn.execute(query, params)
-        await self.conn.commit()
+        with DB_QUERY_SECONDS.time(operation="execute"):
+            async with self._write_lock:
+                await self.conn.execute(query, params)
+                waiter = await self._commit_or_join()
+            if waiter:
+                await asyncio.shield(waiter)
+
+    async def executemany(self, query: str, rows: Iterable[tuple]):
+        """Run one statement for many parameter rows under a single commit."""
+        with DB_QUERY_SECONDS.time(operation="executemany"):
+            async with self._write_lock:
+                await self.conn.executemany(query, rows)
+                waiter = await self._commit_or_join()
+            if waiter:
+                await asyncio.shield(waiter)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Run several statements atomically; commits on exit, rolls back on error.
+        Use the yielded connection inside the block, not execute(), which would
+        wait on the write lock held here.
+        """
+        async with self._write_lock:
+            await self._commit_pending()
+            try:
+                yield self.conn
+            except BaseException:
+                await self.conn.rollback()
+                raise
+            await self.conn.commit()
+
+    async def run_batch(self, batches: Iterable[Tuple[str, Iterable[tuple]]]):
+        """Run several executemany() statements and commit them as one transaction."""
+        with DB_QUERY_SECONDS.time(operation="batch"):
+            async with self.transaction() as conn:
+                for query, rows in batches:
+                    await conn.executemany(query, rows)
+
+    async def _commit_or_join(self) -> Optional[asyncio.Future]:
+        # Called with the write lock held. Without group commit the write is
+        # committed now; otherwise the caller joins the current commit window.
+        if not self.group_commit_window:
+            await self.conn.commit()
+            return None
+        if self._commit_waiter is None:
+            loop = asyncio.get_running_loop()
+            self._commit_waiter = loop.create_future()
+            loop.call_later(self.group_commit_window, self._start_group_commit)
+        return self._commit_waiter
+
+    def _start_group_commit(self):
+        self._group_task = asyncio.create_task(self._group_commit())
+
+    async def _group_commit(self):
+        async with self._write_lock:
+            await self._commit_pending()
+
+    async def _commit_pending(self):
+        # Called with the write lock held; resolves every writer waiting on the window
+        waiter, self._commit_waiter = self._commit_waiter, None
+        if waiter is None:
+            return
+        try:
+            await self.conn.commit()
+        except Exception as e:
+            await self.conn.rollback()
+            waiter.set_exception(e)
+            return
+        waiter.set_result(None)
+        self.group_commits += 1
+
+    async def get_meta(self, key: str) -> Optional[str]:
+        row = await self.fetchone("SELECT value FROM bot_meta WHERE key = ?", (key,))
+        return row[0] if row else None
+
+    async def set_meta(self, key: str, value: str):
+        await self.execute(
+            "INSERT INTO bot_meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
 
     async def close(self):
+        if self.read_conn:
+            await self.read_conn.close()
+            self.read_conn = None
         if self.conn:
+            async with self._write_lock:
+                await self._commit_pending()
             await self.conn.close()
             self.conn = None
 
 # Create a single shared instance
-db = DBManager("/data/active_raids.db")
\ No newline at end of file
+db = DBManager("/data/active_raids.db", DB_GROUP_COMMIT_MS, DB_PROFILE, DB_STATEMENT_CACHE)
\ No newline at end of file
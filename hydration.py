@@ -0,0 +1,128 @@
+import asyncio, heapq, logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Loads one raid's signup message and sign-ups from Discord
+HydrateCallback = Callable[[int], Awaitable[None]]
+
+
+class RaidHydrator:
+    """
+    Loads raids restored from the database in the background, nearest ping first.
+
+    Raids are submitted with their ping timestamp and a few workers hydrate
+    them in that order. A raid that is needed sooner (a reaction arrives or
+    someone asks for its sign-ups) is hydrated on the spot via `ensure`; any
+    number of concurrent callers share that one fetch. Raids that were never
+    submitted, such as ones created after startup, need no hydration.
+    """
+
+    def __init__(self, hydrate: HydrateCallback, workers: int = 2):
+        self._hydrate = hydrate
+        self.workers = workers
+
+        # raid_id -> ping timestamp, for raids not yet started
+        self._pending: Dict[int, float] = {}
+        # (ping timestamp, raid_id); entries no longer in _pending are skipped
+        self._heap: List[Tuple[float, int]] = []
+        # Hydrations in progress, awaited by everyone who needs the raid
+        self._inflight: Dict[int, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.counters = {
+            "background": 0,  # hydrated by the workers, in ping order
+            "on_demand": 0,   # hydrated early because something needed the raid
+            "shared": 0,      # callers that joined a hydration already in flight
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending) + len(self._inflight)
+
+    def needs(self, raid_id: int) -> bool:
+        """True while `raid_id` is waiting for or undergoing hydration."""
+        return raid_id in self._pending or raid_id in self._inflight
+
+    def queued(self) -> List[int]:
+        """Raids whose hydration has not started yet."""
+        return list(self._pending)
+
+    def start(self):
+        if not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            if not self.pending:
+                self._idle.set()
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"raid-hydrator-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def stop(self):
+        tasks = self._tasks + list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, raid_id: int, ping_ts: float):
+        self._pending[raid_id] = ping_ts
+        heapq.heappush(self._heap, (ping_ts, raid_id))
+        if self._wakeup:
+            self._idle.clear()
+            self._wakeup.set()
+
+    def discard(self, raid_id: int):
+        """Forget a raid that has not been hydrated yet, e.g. because it was retired."""
+        self._pending.pop(raid_id, None)
+        self._check_idle()
+
+    async def ensure(self, raid_id: int) -> bool:
+        """Wait until `raid_id` is hydrated; returns True if it had to wait."""
+        task = self._inflight.get(raid_id)
+        if task is None:
+            if raid_id not in self._pending:
+                return False
+            task = self._begin(raid_id, "on_demand")
+        else:
+            self.counters["shared"] += 1
+        # A cancelled caller must not cancel the fetch others are waiting on
+        await asyncio.shield(task)
+        return True
+
+    async def join(self):
+        """Wait until every submitted raid has been hydrated."""
+        await self._idle.wait()
+
+    def _begin(self, raid_id: int, source: str) -> asyncio.Task:
+        del self._pending[raid_id]
+        self.counters[source] += 1
+        task = asyncio.create_task(self._run(raid_id), name=f"hydrate-raid-{raid_id}")
+        self._inflight[raid_id] = task
+        return task
+
+    async def _run(self, raid_id: int):
+        try:
+            await self._hydrate(raid_id)
+        except Exception:
+            logger.exception(f"Hydration of raid {raid_id} failed")
+        finally:
+            self._inflight.pop(raid_id, None)
+            self._check_idle()
+
+    def _check_idle(self):
+        if self._idle and not self._pending and not self._inflight:
+            self._idle.set()
+
+    async def _worker(self):
+        while True:
+            while not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            ping_ts, raid_id = heapq.heappop(self._heap)
+            if self._pending.get(raid_id) != ping_ts:
+                continue  # already hydrated on demand, discarded or resubmitted
+            await asyncio.shield(self._begin(raid_id, "background"))
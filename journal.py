@@ -0,0 +1,144 @@
+import asyncio, logging
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Journal operations
+_ADD, _REMOVE, _RESET, _DROP = range(4)
+
+
+class SignupJournal:
+    """
+    Write-behind journal that persists sign-up reactions to the `signups` table.
+
+    Reaction handlers only append to an in-memory list; a background task
+    compacts the pending operations (last write wins per raid/emoji/user) and
+    applies them in one transaction every `flush_interval_ms`. Rows belonging
+    to raids that no longer exist are purged every `compact_interval` seconds.
+    """
+
+    def __init__(self, db, flush_interval_ms: int = 250, compact_interval: float = 3600.0):
+        self.db = db
+        self.flush_interval = flush_interval_ms / 1000
+        self.compact_interval = compact_interval
+        self._ops: List[tuple] = []
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.flushed_ops = 0
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._ops)
+
+    # --- Recording -------------------------------------------------------
+
+    def record_add(self, raid_id: int, emoji: str, user_id: int):
+        self._ops.append((_ADD, raid_id, emoji, user_id))
+
+    def record_remove(self, raid_id: int, emoji: str, user_id: int):
+        self._ops.append((_REMOVE, raid_id, emoji, user_id))
+
+    def replace_raid(self, raid_id: int, cache: Dict[str, Set[int]]):
+        """Overwrite a raid's stored sign-ups with a fresh snapshot from Discord."""
+        snapshot = {emoji: set(uids) for emoji, uids in cache.items()}
+        self._ops.append((_RESET, raid_id, snapshot, None))
+
+    def drop_raid(self, raid_id: int):
+        self._ops.append((_DROP, raid_id, None, None))
+
+    # --- Loading ---------------------------------------------------------
+
+    async def load(self) -> Tuple[Dict[int, Dict[str, Set[int]]], Set[int]]:
+        """
+        Return every stored sign-up keyed by raid, plus the ids of raids whose
+        stored state was written by a full Discord sync at least once.
+        """
+        cache: Dict[int, Dict[str, Set[int]]] = {}
+        for raid_id, emoji, user_id in await self.db.fetchall(
+            "SELECT raid_id, emoji, user_id FROM signups ORDER BY raid_id"
+        ):
+            cache.setdefault(raid_id, {}).setdefault(emoji, set()).add(user_id)
+        synced = {row[0] for row in await self.db.fetchall(
+            "SELECT raid_id FROM active_raids WHERE signups_synced = 1"
+        )}
+        return cache, synced
+
+    # --- Background flushing ---------------------------------------------
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="signup-journal")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        since_compaction = 0.0
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+                since_compaction += self.flush_interval
+                if since_compaction >= self.compact_interval:
+                    since_compaction = 0.0
+                    await self.compact()
+            except Exception:
+                logger.exception("Sign-up journal flush failed; will retry.")
+
+    async def flush(self):
+        if not self._ops:
+            return
+        async with self._flush_lock:
+            ops, self._ops = self._ops, []
+            try:
+                await self.db.run_batch(self._compile(ops))
+            except Exception:
+                # Put the operations back in front of anything recorded meanwhile
+                self._ops = ops + self._ops
+                raise
+            self.flushes += 1
+            self.flushed_ops += len(ops)
+
+    @staticmethod
+    def _compile(ops: List[tuple]) -> List[Tuple[str, list]]:
+        # Collapse the journal: final state per key, plus raids that were reset/dropped
+        latest: Dict[int, Dict[Tuple[str, int], int]] = {}
+        cleared: Set[int] = set()
+        synced: Set[int] = set()
+        for op, raid_id, emoji, user_id in ops:
+            if op in (_ADD, _REMOVE):
+                latest.setdefault(raid_id, {})[(emoji, user_id)] = op
+                continue
+            cleared.add(raid_id)
+            if op == _RESET:
+                synced.add(raid_id)
+                latest[raid_id] = {(e, uid): _ADD for e, uids in emoji.items() for uid in uids}
+            else:
+                synced.discard(raid_id)
+                latest.pop(raid_id, None)
+
+        inserts, deletes = [], []
+        for raid_id, keys in latest.items():
+            for (emoji, user_id), op in keys.items():
+                (inserts if op == _ADD else deletes).append((raid_id, emoji, user_id))
+        return [
+            ("DELETE FROM signups WHERE raid_id = ?", [(r,) for r in cleared]),
+            ("INSERT OR IGNORE INTO signups (raid_id, emoji, user_id) VALUES (?, ?, ?)", inserts),
+            ("DELETE FROM signups WHERE raid_id = ? AND emoji = ? AND user_id = ?", deletes),
+            ("UPDATE active_raids SET signups_synced = 1 WHERE raid_id = ?", [(r,) for r in synced]),
+        ]
+
+    async def compact(self):
+        """Purge stored sign-ups of raids that are no longer active."""
+        await self.db.execute(
+            "DELETE FROM signups WHERE raid_id NOT IN (SELECT raid_id FROM active_raids)"
+        )
@@ -0,0 +1,125 @@
+import asyncio, logging, time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Renders the full content of a raid's roster message; None if the raid is gone
+RosterRender = Callable[[int], Awaitable[Optional[str]]]
+# Edits (or first posts) a raid's roster message with the rendered content
+RosterEdit = Callable[[int, str], Awaitable[None]]
+
+
+class LiveRosterUpdater:
+    """
+    Coalesces sign-up changes into debounced edits of each raid's live roster.
+
+    `touch` only marks a raid dirty. Each channel with dirty raids gets one
+    task that waits until no change has arrived for `delay` seconds (but no
+    longer than `max_delay` after the first one), then renders every dirty
+    raid in the channel and edits those whose text changed since the last
+    edit. Edits in a channel are spaced `interval` seconds apart, below
+    Discord's per-channel edit bucket, so a reaction storm on a busy post
+    becomes a handful of edits instead of 429s.
+    """
+
+    def __init__(self, render: RosterRender, edit: RosterEdit, delay: float = 2.0,
+                 max_delay: float = 10.0, interval: float = 1.5):
+        self._render = render
+        self._edit = edit
+        self.delay = delay
+        self.max_delay = max_delay
+        self.interval = interval
+
+        # channel id -> raids changed since the channel's last flush
+        self._dirty: Dict[int, Set[int]] = {}
+        # channel id -> (first, last) change in the current window
+        self._window: Dict[int, Tuple[float, float]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._last_edit: Dict[int, float] = {}
+        # raid id -> hash of the content last sent
+        self._sent: Dict[int, int] = {}
+
+        self.counters = {
+            "touched": 0,    # sign-up changes reported
+            "rendered": 0,   # rosters rendered after a quiet period
+            "edited": 0,     # messages edited or posted
+            "unchanged": 0,  # renders skipped because the text was the same
+            "failed": 0,     # renders or edits that raised
+        }
+
+    @property
+    def pending(self) -> int:
+        return sum(map(len, self._dirty.values()))
+
+    def touch(self, raid_id: int, channel_id: int):
+        """A raid's sign-ups changed; its roster is re-rendered once the channel goes quiet."""
+        now = time.monotonic()
+        self.counters["touched"] += 1
+        self._dirty.setdefault(channel_id, set()).add(raid_id)
+        first, _ = self._window.get(channel_id, (now, now))
+        self._window[channel_id] = (first, now)
+        if channel_id not in self._tasks:
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id), name=f"live-roster:{channel_id}")
+
+    def seen(self, raid_id: int, content: str):
+        """Record content already on Discord, so an identical render is not sent again."""
+        self._sent[raid_id] = hash(content)
+
+    def forget(self, raid_id: int):
+        self._sent.pop(raid_id, None)
+        for raids in self._dirty.values():
+            raids.discard(raid_id)
+
+    async def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self, channel_id: int):
+        try:
+            while self._dirty.get(channel_id):
+                await self._settle(channel_id)
+                raids = self._dirty.pop(channel_id, set())
+                self._window.pop(channel_id, None)
+                for raid_id in sorted(raids):
+                    await self._flush(channel_id, raid_id)
+        finally:
+            self._tasks.pop(channel_id, None)
+            # Raids forgotten while waiting can leave an empty entry behind
+            if not self._dirty.get(channel_id):
+                self._dirty.pop(channel_id, None)
+                self._window.pop(channel_id, None)
+
+    async def _settle(self, channel_id: int):
+        # Sleep until the channel has been quiet for `delay`, capped by `max_delay` and the edit spacing
+        while True:
+            first, last = self._window[channel_id]
+            due = max(min(last + self.delay, first + self.max_delay),
+                      self._last_edit.get(channel_id, 0.0) + self.interval)
+            now = time.monotonic()
+            if due <= now:
+                return
+            await asyncio.sleep(due - now)
+
+    async def _flush(self, channel_id: int, raid_id: int):
+        try:
+            content = await self._render(raid_id)
+            self.counters["rendered"] += 1
+            if content is None:
+                self._sent.pop(raid_id, None)
+                return
+            digest = hash(content)
+            if self._sent.get(raid_id) == digest:
+                self.counters["unchanged"] += 1
+                return
+            wait = self._last_edit.get(channel_id, 0.0) + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_edit[channel_id] = time.monotonic()
+            await self._edit(raid_id, content)
+            self._sent[raid_id] = digest
+            self.counters["edited"] += 1
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.warning(f"Could not update the live roster of raid {raid_id}: {e}")
@@ -0,0 +1,170 @@
+import asyncio, logging, os, sys, threading, time, traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Frames from these files are ours; the first one on the stack names the culprit
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "raidbot_event_loop_lag_seconds", "How late the event loop ran the monitor's heartbeat.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+
+@dataclass
+class Stall:
+    """One period where the event loop did not get back to the monitor in time."""
+    started: float
+    duration: float
+    task: str
+    coroutine: str
+    where: str
+    stack: List[str] = field(repr=False)
+
+
+class LoopMonitor:
+    """
+    Measures event-loop scheduling lag and names whatever is blocking the loop.
+
+    A heartbeat coroutine wakes every `interval` seconds and records how late
+    it woke. A watchdog thread watches the heartbeat; when it is more than
+    `threshold` seconds overdue the loop is stuck inside one callback, so the
+    thread samples the loop thread's stack with sys._current_frames() and
+    records the running task, its coroutine and the innermost bot frame
+    (e.g. load_persistent_raids, showsignups or a view callback).
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, history: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[Stall] = deque(maxlen=history)
+
+        self.samples = 0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.over_threshold = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # Stall the watchdog is currently tracking; finished by the next heartbeat
+        self._open_stall: Optional[Stall] = None
+
+    def start(self):
+        if self._task:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat(), name="loop-monitor")
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"Event loop monitor started on {type(self._loop).__module__}.{type(self._loop).__name__} "
+                    f"(threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "loop": type(self._loop).__name__ if self._loop else None,
+            "samples": self.samples,
+            "mean_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "over_threshold": self.over_threshold,
+            "stalls": [
+                {"duration_ms": round(s.duration * 1000), "task": s.task, "coroutine": s.coroutine, "where": s.where}
+                for s in self.stalls
+            ],
+        }
+
+    # --- Event loop side -------------------------------------------------
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - expected)
+
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            if lag < self.threshold:
+                continue
+
+            self.over_threshold += 1
+            stall, self._open_stall = self._open_stall, None
+            if stall:
+                stall.duration = lag
+                self.stalls.append(stall)
+                logger.warning(
+                    f"Event loop blocked for {lag * 1000:.0f} ms by task {stall.task!r} "
+                    f"({stall.coroutine}) at {stall.where}\n" + "".join(stall.stack))
+            else:
+                # Many short callbacks rather than one long one; nothing to blame
+                logger.warning(f"Event loop lagged {lag * 1000:.0f} ms")
+
+    # --- Watchdog thread -------------------------------------------------
+
+    def _watchdog(self):
+        while not self._stopping.wait(self.interval / 2):
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue < self.threshold or self._open_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._open_stall = self._describe(frame, overdue)
+
+    def _describe(self, frame, overdue: float) -> Stall:
+        # Reading the running task from another thread is a racy dict lookup, which is
+        # fine for a diagnostic: at worst we name the task that just finished.
+        task = getattr(asyncio.tasks, "_current_tasks", {}).get(self._loop)
+        if task is not None:
+            coro = task.get_coro()
+            task_name, coroutine = task.get_name(), getattr(coro, "__qualname__", repr(coro))
+        else:
+            task_name, coroutine = "<callback>", "-"
+
+        summary = traceback.extract_stack(frame)
+        where = "-"
+        for entry in reversed(summary):
+            if entry.filename.startswith(_PROJECT_DIR) and "site-packages" not in entry.filename:
+                where = f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+                break
+        return Stall(started=time.time(), duration=overdue, task=task_name, coroutine=coroutine,
+                     where=where, stack=traceback.format_list(summary[-15:]))
+
+
+def install_event_loop(use_uvloop: bool):
+    """Switch asyncio to uvloop when asked to and available; call before the loop starts."""
+    if not use_uvloop:
+        return
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("USE_UVLOOP is set but uvloop is not installed; using the default asyncio loop.")
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info(f"Using uvloop {uvloop.__version__}")
@@ -0,0 +1,130 @@
+import asyncio, logging, time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from discord import Guild, Member
+
+logger = logging.getLogger(__name__)
+
+# Discord answers a member request for at most 100 user ids
+QUERY_BATCH = 100
+
+# Called with the fresh Member when a re-queried user's display name changed
+NameChangeCallback = Callable[[Member], None]
+
+
+class MemberResolver:
+    """
+    Bounded TTL cache of guild members, filled on demand instead of by chunking.
+
+    Used when the guild is not chunked at startup: the members of a raid's
+    sign-ups are requested over the gateway in batches of 100 just before
+    its roster is rendered, and kept for `ttl` seconds in an LRU of at most
+    `maxsize` users. Users that are no longer in the guild are remembered as
+    missing for the same time, so they are not requested on every render.
+    Members from reaction events are cached as they arrive.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 3600.0,
+                 on_name_change: Optional[NameChangeCallback] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._on_name_change = on_name_change
+        # user id -> (expiry, member or None if not in the guild)
+        self._entries: "OrderedDict[int, Tuple[float, Optional[Member]]]" = OrderedDict()
+        # One gateway request at a time; queued callers usually find their users cached by then
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.queries = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, guild: Guild, uid: int) -> Optional[Member]:
+        """Member from discord.py's cache or this one; never makes a request."""
+        member = guild.get_member(uid)
+        if member is not None:
+            return member
+        entry = self._entries.get(uid)
+        return entry[1] if entry else None
+
+    def remember(self, member: Member):
+        self._store(member.id, member, time.monotonic() + self.ttl)
+
+    async def resolve(self, guild: Guild, uids: Iterable[int]) -> Dict[int, Member]:
+        """Return the members for `uids`, requesting the ones not cached or expired."""
+        found: Dict[int, Member] = {}
+        wanted = self._collect(guild, uids, found)
+        if not wanted:
+            return found
+        async with self._lock:
+            # Another caller may have fetched some of them meanwhile
+            wanted = self._collect(guild, wanted, found, count=False)
+            for start in range(0, len(wanted), QUERY_BATCH):
+                batch = wanted[start:start + QUERY_BATCH]
+                self.queries += 1
+                members = await guild.query_members(user_ids=batch, limit=len(batch), cache=False)
+                expiry = time.monotonic() + self.ttl
+                returned = {member.id: member for member in members}
+                for uid in batch:
+                    member = returned.get(uid)
+                    self._store(uid, member, expiry)
+                    if member is not None:
+                        found[uid] = member
+        return found
+
+    def invalidate(self, uid: int) -> bool:
+        return self._entries.pop(uid, None) is not None
+
+    def evict(self, count: int) -> int:
+        """Drop up to `count` least recently used entries."""
+        count = min(count, len(self._entries))
+        for _ in range(count):
+            self._entries.popitem(last=False)
+        self.evictions += count
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "queries": self.queries,
+            "evictions": self.evictions,
+        }
+
+    def _collect(self, guild: Guild, uids: Iterable[int], found: Dict[int, Member], count: bool = True) -> List[int]:
+        """Fill `found` from the caches; return the user ids that need a request."""
+        now = time.monotonic()
+        wanted = []
+        for uid in uids:
+            if uid in found:
+                continue
+            member = guild.get_member(uid)
+            if member is not None:
+                found[uid] = member
+                continue
+            entry = self._entries.get(uid)
+            if entry is not None and entry[0] > now:
+                self.hits += count
+                self._entries.move_to_end(uid)
+                if entry[1] is not None:
+                    found[uid] = entry[1]
+                continue
+            self.misses += count
+            wanted.append(uid)
+        return wanted
+
+    def _store(self, uid: int, member: Optional[Member], expiry: float):
+        old = self._entries.pop(uid, None)
+        self._entries[uid] = (expiry, member)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        if (self._on_name_change and member is not None and old is not None and old[1] is not None
+                and old[1].display_name != member.display_name):
+            self._on_name_change(member)
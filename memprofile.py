@@ -0,0 +1,138 @@
+import asyncio, gc, sys, time, tracemalloc
+from types import BuiltinFunctionType, CodeType, FrameType, FunctionType, MethodType, ModuleType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Frames kept per allocation; more frames attribute better but cost more memory
+TRACE_FRAMES = 10
+
+# Never descended into while sizing: shared, process-wide objects, and frames
+# of running tasks, whose globals would lead everywhere
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, CodeType, FrameType)
+
+# Allocations made by the profiler itself are left out of the report
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def deep_sizeof(roots: Iterable[object], stop: Iterable[object] = ()) -> Tuple[int, int]:
+    """
+    Bytes and object count reachable from `roots`, without entering `stop`.
+
+    Objects shared with the rest of the process (the client, its connection
+    state, guilds) go in `stop` so that, for example, a cached Message is
+    counted without the guild it points to.
+    """
+    pending = list(roots)
+    # Roots that are also in `stop` are still counted
+    seen = {id(obj) for obj in stop} - {id(obj) for obj in pending}
+    size = count = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _OPAQUE):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        count += 1
+        pending.extend(gc.get_referents(obj))
+    return size, count
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots diffed against a baseline, plus sizes of named object groups.
+
+    `start` begins tracing and `mark_baseline` records the snapshot later
+    reports are compared with (the bot takes it once the persistent raids are
+    loaded). Groups are callables returning the root objects of something
+    worth watching, such as the sign-ups cache or discord.py's member cache;
+    each report sizes them by walking what they reference.
+    """
+
+    def __init__(self, frames: int = TRACE_FRAMES):
+        self.frames = frames
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at: Optional[float] = None
+        self.groups: Dict[str, Callable[[], Iterable[object]]] = {}
+        self.stop_objects: Callable[[], Iterable[object]] = tuple
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def mark_baseline(self):
+        self.start()
+        self.baseline = self._snapshot()
+        self.baseline_at = time.time()
+
+    def group(self, name: str, roots: Callable[[], Iterable[object]]):
+        self.groups[name] = roots
+
+    def sizes(self, roots: Optional[Dict[str, List[object]]] = None,
+              stop: Optional[List[object]] = None) -> List[Tuple[str, int, int]]:
+        """(group, bytes, objects) for every registered group, or for pre-collected `roots`."""
+        if roots is None:
+            roots = self._collect_roots()
+        stop = list(self.stop_objects()) if stop is None else stop
+        return [(name, *deep_sizeof(group, stop)) for name, group in roots.items()]
+
+    async def report_async(self, top: int = 10) -> str:
+        """
+        `report` without blocking the event loop for the snapshot diff and the walks.
+
+        The group roots are collected here, on the loop that mutates the caches
+        they come from; everything after that runs in a worker thread, which
+        still competes with the loop for the GIL but lets it keep switching.
+        """
+        roots, stop = self._collect_roots(), list(self.stop_objects())
+        return await asyncio.to_thread(self.report, top, roots, stop)
+
+    def report(self, top: int = 10, roots: Optional[Dict[str, List[object]]] = None,
+               stop: Optional[List[object]] = None) -> str:
+        lines = []
+        if self.tracing and self.baseline is not None:
+            snapshot = self._snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            diff = snapshot.compare_to(self.baseline, "lineno")
+            grown = sum(stat.size_diff for stat in diff)
+            age = time.time() - self.baseline_at
+            lines.append(f"Traced {current / 2**20:.1f} MB (peak {peak / 2**20:.1f} MB), "
+                         f"{grown / 2**20:+.2f} MB since the baseline {age / 3600:.1f}h ago")
+            lines.append(f"Top {top} allocation sites by growth:")
+            for stat in diff[:top]:
+                frame = stat.traceback[0]
+                lines.append(f"  {stat.size_diff / 1024:+9.1f} KiB {stat.count_diff:+7} blocks  "
+                             f"{_short_path(frame.filename)}:{frame.lineno}")
+        elif self.tracing:
+            lines.append("Tracing, but no baseline has been taken yet.")
+        else:
+            lines.append("tracemalloc is not running; allocation sites are not available.")
+
+        started = time.perf_counter()
+        sizes = self.sizes(roots, stop)
+        lines.append(f"Reachable memory by group (walked in {time.perf_counter() - started:.2f}s):")
+        for name, size, count in sizes:
+            lines.append(f"  {size / 2**20:9.2f} MB {count:9} objects  {name}")
+        return "\n".join(lines)
+
+    def _collect_roots(self) -> Dict[str, List[object]]:
+        return {name: list(roots()) for name, roots in self.groups.items()}
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+def _short_path(filename: str) -> str:
+    # site-packages/discord/state.py -> discord/state.py
+    for marker in ("site-packages/", "dist-packages/"):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return filename
@@ -0,0 +1,219 @@
+import logging, math, time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+from discord import Interaction, InteractionResponse, InteractionType, app_commands
+
+logger = logging.getLogger(__name__)
+
+# Seconds; fine-grained at the low end, where handlers and queries should live
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Prometheus histogram with a fixed label set; observations are O(buckets)."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + ("+Inf" if math.isinf(bound) else repr(bound)) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total[0])}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}"
+
+
+class Gauge:
+    """Value read from a callback at scrape time, so hot paths never update it."""
+
+    def __init__(self, name: str, help: str, read: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> Iterator[str]:
+        try:
+            value = float(self.read())
+        except Exception:
+            logger.exception(f"Could not read gauge {self.name}")
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(name, help, read))
+
+    def counter(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        """Monotonic count kept by its owner (e.g. a stats attribute), read at scrape time."""
+        return self._register(Gauge(name, help, read, kind="counter"))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves the registry in Prometheus text format from the bot's own event loop."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "0.0.0.0", port: int = 8080):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.router.add_get("/metrics", self._metrics)
+        self.app.router.add_get("/healthz", self._health)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self):
+        if self._runner:
+            return
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Metrics server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+
+# Slot descriptor behind InteractionResponse._response_type. Both are private to
+# discord.py; if either goes away, commands are timed without the defer phase.
+_RESPONSE_TYPE = InteractionResponse.__dict__.get("_response_type")
+_TIMED_RESPONSE = (hasattr(_RESPONSE_TYPE, "__set__")
+                   and "_cs_response" in getattr(Interaction, "__slots__", ()))
+if not _TIMED_RESPONSE:
+    logger.warning("This discord.py version hides the interaction response; recording total command time only")
+
+
+class _TimedResponse(InteractionResponse):
+    # Every response method (defer, send_message, send_modal, ...) sets
+    # _response_type once, so this records when the interaction was acknowledged.
+    __slots__ = ("responded_at",)
+
+    @property
+    def _response_type(self):
+        return _RESPONSE_TYPE.__get__(self, InteractionResponse)
+
+    @_response_type.setter
+    def _response_type(self, value):
+        if value is not None and getattr(self, "responded_at", None) is None:
+            self.responded_at = time.perf_counter()
+        _RESPONSE_TYPE.__set__(self, value)
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """
+    CommandTree that records time-to-defer and total time for every slash
+    command. Time-to-defer needs discord.py internals, see _TIMED_RESPONSE.
+    """
+
+    async def _call(self, interaction):
+        if interaction.type is not InteractionType.application_command:
+            return await super()._call(interaction)
+        started = time.perf_counter()
+        response = None
+        if _TIMED_RESPONSE:
+            response = interaction._cs_response = _TimedResponse(interaction)
+        try:
+            await super()._call(interaction)
+        finally:
+            command = interaction.command.qualified_name if interaction.command else "unknown"
+            responded_at = getattr(response, "responded_at", None)
+            if responded_at is not None:
+                COMMAND_SECONDS.observe(responded_at - started, command=command, phase="defer")
+            COMMAND_SECONDS.observe(time.perf_counter() - started, command=command, phase="total")
+
+
+# Shared registry and the instruments used across modules
+metrics = MetricsRegistry()
+
+EVENT_SECONDS = metrics.histogram(
+    "raidbot_event_handler_seconds", "Time spent in gateway event handlers.", ("event",))
+COMMAND_SECONDS = metrics.histogram(
+    "raidbot_command_seconds",
+    "Slash command latency; phase=defer is time to the first response, phase=total is the whole callback.",
+    ("command", "phase"))
+DB_QUERY_SECONDS = metrics.histogram(
+    "raidbot_db_query_seconds", "DBManager call latency, including waits for the write lock.", ("operation",))
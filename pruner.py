@@ -0,0 +1,174 @@
+import asyncio, logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Resolves (channel_id, message_id) to a Message, preferably from cache
+MessageResolver = Callable[[int, int], Awaitable[discord.Message]]
+
+
+class ReactionPruner:
+    """
+    Coalescing queue that removes disallowed reactions from signup posts.
+
+    Pending removals are grouped per message and de-duplicated per
+    (emoji, user). A fixed number of workers drain the queue, each handling
+    one message at a time, so a reaction storm costs at most `workers`
+    concurrent requests. When `clear_threshold` users are pending on the same
+    bad emoji, the emoji is removed with a single clear_reaction call. If
+    the message can't be fetched, its removals go back in the queue and are
+    retried with a growing delay, up to MAX_ATTEMPTS fetches.
+    """
+
+    # Fetches of a message tried before its pending removals are dropped, and the backoff step
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = 2.0
+
+    def __init__(self, resolve_message: MessageResolver, workers: int = 2,
+                 clear_threshold: int = 5, max_pending: int = 2000):
+        self._resolve_message = resolve_message
+        self.workers = workers
+        self.clear_threshold = clear_threshold
+        self.max_pending = max_pending
+
+        # message_id -> emoji -> user ids awaiting removal
+        self._pending: Dict[int, Dict[str, Set[int]]] = {}
+        self._channels: Dict[int, int] = {}
+        # Messages waiting in the queue or being worked on
+        self._scheduled: Set[int] = set()
+        self._size = 0
+        # Failed message fetches per message, reset once one succeeds
+        self._attempts: Dict[int, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.counters = {
+            "queued": 0,      # removals accepted into the queue
+            "coalesced": 0,   # duplicates of a removal already pending
+            "dropped": 0,     # rejected because the queue was full
+            "withdrawn": 0,   # the user removed the reaction before we did
+            "removed": 0,     # single-user remove_reaction calls made
+            "cleared": 0,     # clear_reaction calls made
+            "failed": 0,      # calls that raised, or removals dropped after failed fetches
+        }
+
+    @property
+    def pending(self) -> int:
+        return self._size
+
+    def start(self):
+        if not self._tasks:
+            self._queue = asyncio.Queue()
+            self._tasks = [
+                asyncio.create_task(self._worker(), name=f"reaction-pruner-{i}")
+                for i in range(self.workers)
+            ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, channel_id: int, message_id: int, emoji: str, user_id: int):
+        """Queue removal of one disallowed reaction; never blocks."""
+        users = self._pending.get(message_id, {}).get(emoji)
+        if users is not None and user_id in users:
+            self.counters["coalesced"] += 1
+            return
+        if self._size >= self.max_pending:
+            self.counters["dropped"] += 1
+            return
+
+        self._pending.setdefault(message_id, {}).setdefault(emoji, set()).add(user_id)
+        self._channels[message_id] = channel_id
+        self._size += 1
+        self.counters["queued"] += 1
+        if message_id not in self._scheduled:
+            self._scheduled.add(message_id)
+            self._queue.put_nowait(message_id)
+
+    def withdraw(self, message_id: int, emoji: str, user_id: int):
+        """Forget a pending removal because the user already un-reacted."""
+        work = self._pending.get(message_id, {})
+        users = work.get(emoji)
+        if users and user_id in users:
+            users.discard(user_id)
+            self._size -= 1
+            self.counters["withdrawn"] += 1
+            # Nothing left to remove means nothing to fetch the message for
+            if not users:
+                del work[emoji]
+                if not work:
+                    del self._pending[message_id]
+
+    async def _worker(self):
+        while True:
+            message_id = await self._queue.get()
+            retry_in = 0.0
+            try:
+                # Anything submitted while we work on this message is picked up here
+                while self._pending.get(message_id):
+                    work = self._pending.pop(message_id)
+                    self._size -= sum(len(users) for users in work.values())
+                    try:
+                        msg = await self._resolve_message(self._channels[message_id], message_id)
+                    except Exception as e:
+                        retry_in = self._put_back(message_id, work, e)
+                        break
+                    self._attempts.pop(message_id, None)
+                    await self._prune_message(msg, message_id, work)
+            except Exception:
+                logger.exception(f"Reaction pruner failed on message {message_id}")
+            finally:
+                if self._pending.get(message_id):
+                    # Put back after a failed fetch, or submitted while a failed attempt was in flight
+                    asyncio.get_running_loop().call_later(retry_in, self._queue.put_nowait, message_id)
+                else:
+                    self._pending.pop(message_id, None)
+                    self._scheduled.discard(message_id)
+                    self._channels.pop(message_id, None)
+                    self._attempts.pop(message_id, None)
+                self._queue.task_done()
+
+    def _put_back(self, message_id: int, work: Dict[str, Set[int]], error: Exception) -> float:
+        """Return removals whose message could not be fetched to the queue; seconds to wait before retrying."""
+        size = sum(len(users) for users in work.values())
+        attempts = self._attempts.get(message_id, 0) + 1
+        if attempts >= self.MAX_ATTEMPTS or isinstance(error, discord.NotFound):
+            self._attempts.pop(message_id, None)
+            self.counters["failed"] += size
+            logger.warning(f"Giving up on {size} reaction removals on {message_id} after {attempts} attempts: {error}")
+            return 0.0
+        self._attempts[message_id] = attempts
+        pending = self._pending.setdefault(message_id, {})
+        for emoji, users in work.items():
+            pending.setdefault(emoji, set()).update(users)
+        self._size += size
+        logger.warning(f"Could not fetch message {message_id} to prune reactions (attempt {attempts}): {error}")
+        return self.RETRY_DELAY * attempts
+
+    async def _prune_message(self, msg: discord.Message, message_id: int, work: Dict[str, Set[int]]):
+        for emoji, users in work.items():
+            if not users:
+                continue
+            if len(users) >= self.clear_threshold:
+                # Many users on the same bad emoji: one call removes all of them
+                await self._call(msg.clear_reaction(emoji), "cleared", emoji, message_id)
+                continue
+            for user_id in users:
+                # Remove only that single emoji instance from the offending user
+                await self._call(msg.remove_reaction(emoji, discord.Object(id=user_id)), "removed", emoji, message_id)
+
+    async def _call(self, request: Awaitable, counter: str, emoji: str, message_id: int):
+        try:
+            await request
+            self.counters[counter] += 1
+        except discord.NotFound:
+            # Message or reaction already gone
+            self.counters[counter] += 1
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.warning(f"Could not prune reaction {emoji} on {message_id}: {e}")
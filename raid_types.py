@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from string import Formatter
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+from config import RAID_REACTIONS, RAID_TEMPLATES, SIGNUP_MAPPINGS
+
+# Placeholders every signup template may use
+TEMPLATE_FIELDS = frozenset({"name", "timestamp", "duration", "GUILD_MEMBER_PING"})
+
+# Discord rejects more unique reactions than this on one message
+MAX_UNIQUE_REACTIONS = 20
+
+
+@dataclass(frozen=True, slots=True)
+class RaidTypeDefinition:
+    name: str
+    template: str
+    # Template split into (literal text, field name or None) segments
+    segments: Tuple[Tuple[str, str], ...]
+    # Reactions in seeding order
+    emojis: Tuple[str, ...]
+    allowed: FrozenSet[str]
+    # Emoji -> compact slot number, in seeding order
+    slots: Mapping[str, int]
+    # (emoji, role description) in display order
+    roles: Tuple[Tuple[str, str], ...]
+
+    def render(self, **fields: str) -> str:
+        """Fill the signup template from its pre-parsed segments."""
+        return "".join(literal + (fields[field] if field else "") for literal, field in self.segments)
+
+
+def _parse_template(template: str) -> Tuple[Tuple[str, str], ...]:
+    segments = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if spec or conversion:
+            raise ValueError(f"format spec/conversion on {{{field}}} is not supported")
+        segments.append((literal, field))
+    return tuple(segments)
+
+
+def compile_raid_types(
+    templates: Dict[str, str],
+    reactions: Dict[str, List[str]],
+    mappings: Dict[str, dict],
+) -> Mapping[str, RaidTypeDefinition]:
+    """
+    Build one immutable definition per raid type from the three config dicts.
+    Raises ValueError listing every inconsistency instead of failing later.
+    """
+    errors: List[str] = []
+    names = set(templates) | set(reactions) | set(mappings)
+    for source, table in (("RAID_TEMPLATES", templates), ("RAID_REACTIONS", reactions),
+                          ("SIGNUP_MAPPINGS", mappings)):
+        for missing in sorted(names - set(table)):
+            errors.append(f"{missing!r} is missing from {source}")
+
+    compiled: Dict[str, RaidTypeDefinition] = {}
+    for name in templates:
+        if name not in reactions or name not in mappings:
+            continue
+        problems = []
+
+        try:
+            segments = _parse_template(templates[name])
+        except ValueError as e:
+            problems.append(f"template: {e}")
+            segments = ()
+        unknown = {field for _, field in segments if field} - TEMPLATE_FIELDS
+        if unknown:
+            problems.append(f"template uses unknown fields {sorted(unknown)}")
+
+        emojis = tuple(reactions[name])
+        duplicates = sorted({e for e in emojis if emojis.count(e) > 1})
+        if duplicates:
+            problems.append(f"duplicate reactions {duplicates}")
+        if len(set(emojis)) > MAX_UNIQUE_REACTIONS:
+            problems.append(f"{len(set(emojis))} reactions exceed Discord's limit of {MAX_UNIQUE_REACTIONS}")
+
+        roles = tuple(mappings[name].get("roles", {}).items())
+        unmapped = [emoji for emoji, _ in roles if emoji not in emojis]
+        if unmapped:
+            problems.append(f"roles without a reaction {unmapped}")
+        not_in_post = [emoji for emoji, _ in roles if emoji not in templates[name]]
+        if not_in_post:
+            problems.append(f"roles not shown in the template {not_in_post}")
+
+        if problems:
+            errors.extend(f"{name!r}: {problem}" for problem in problems)
+            continue
+
+        slots = {}
+        for emoji in emojis:
+            slots.setdefault(emoji, len(slots))
+        compiled[name] = RaidTypeDefinition(
+            name=name,
+            template=templates[name],
+            segments=segments,
+            emojis=emojis,
+            allowed=frozenset(emojis),
+            slots=MappingProxyType(slots),
+            roles=roles,
+        )
+
+    if errors:
+        raise ValueError("Invalid raid type configuration:\n  " + "\n  ".join(errors))
+    return MappingProxyType(compiled)
+
+
+# Compiled once at import so a bad config stops the bot before it connects
+RAID_TYPES = compile_raid_types(RAID_TEMPLATES, RAID_REACTIONS, SIGNUP_MAPPINGS)
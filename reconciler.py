@@ -0,0 +1,100 @@
+import asyncio, logging, time
+from typing import Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Checks one raid against Discord; returns the number of emoji it corrected
+RaidCheck = Callable[[int], Awaitable[int]]
+
+
+class SignupReconciler:
+    """
+    Slow anti-entropy loop that repairs sign-ups missed while the gateway was away.
+
+    A pass walks every active raid and calls `check` on it, which compares the
+    cached sign-ups with the reaction counts of one message fetch and pages
+    only the emoji that disagree. Passes run every `interval` seconds and
+    shortly after each (re)connect. Checks call `pace()` before every REST
+    request, which spaces them at least `request_interval` seconds apart, so
+    reconciliation trickles along instead of competing with commands.
+    """
+
+    # Seconds to wait after a (re)connect so queued gateway events land first
+    SETTLE = 10.0
+
+    def __init__(self, check: RaidCheck, raid_ids: Callable[[], Iterable[int]],
+                 interval: float = 1800.0, request_interval: float = 2.0):
+        self._check = check
+        self._raid_ids = raid_ids
+        self.interval = interval
+        self.request_interval = request_interval
+
+        self._next_request = 0.0
+        self._reason: Optional[str] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.counters = {
+            "passes": 0,     # completed passes over all raids
+            "checked": 0,    # raids compared with Discord
+            "corrected": 0,  # emoji whose sign-ups were re-fetched or cleared
+            "failed": 0,     # raid checks that raised
+        }
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="signup-reconciler")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def trigger(self, reason: str):
+        """Run a pass soon, e.g. after the gateway reconnected."""
+        if self._wakeup:
+            self._reason = reason
+            self._wakeup.set()
+
+    async def pace(self):
+        """Wait for the next request slot."""
+        now = time.monotonic()
+        slot = max(now, self._next_request)
+        self._next_request = slot + self.request_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+                await asyncio.sleep(self.SETTLE)
+                reason = self._reason
+            except asyncio.TimeoutError:
+                reason = "timer"
+            self._wakeup.clear()
+            await self.run_pass(reason)
+
+    async def run_pass(self, reason: str = "manual"):
+        started = time.perf_counter()
+        checked = corrected = 0
+        for raid_id in list(self._raid_ids()):
+            try:
+                fixed = await self._check(raid_id)
+            except Exception as e:
+                self.counters["failed"] += 1
+                logger.warning(f"Could not reconcile sign-ups of raid {raid_id}: {e}")
+                continue
+            checked += 1
+            corrected += fixed
+        self.counters["passes"] += 1
+        self.counters["checked"] += checked
+        self.counters["corrected"] += corrected
+        log = logger.info if corrected else logger.debug
+        log(f"Reconciled {checked} raids ({reason}) in {time.perf_counter() - started:.1f}s; "
+            f"{corrected} emoji corrected.")
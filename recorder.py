@@ -0,0 +1,159 @@
+import asyncio, logging, os, struct, time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RBEV1\n"
+
+# Record kinds
+REACTION_ADD, REACTION_REMOVE, INTERACTION, RAID_OPEN, RAID_CLOSE, SIGNUP, SIGNUP_RESET = range(1, 8)
+KIND_NAMES = {REACTION_ADD: "reaction_add", REACTION_REMOVE: "reaction_remove", INTERACTION: "interaction",
+              RAID_OPEN: "raid_open", RAID_CLOSE: "raid_close", SIGNUP: "signup", SIGNUP_RESET: "signup_reset"}
+
+# Flags
+FLAG_BOT = 1
+
+# kind, flags, wall time, message/raid id, user id, channel id, text length; then the UTF-8 text
+_HEADER = struct.Struct("<BBdQQQB")
+
+# RAID_OPEN text is "<raid type>\x1f<raid name>"
+FIELD_SEP = "\x1f"
+
+
+@dataclass(slots=True)
+class Event:
+    kind: int
+    flags: int
+    ts: float
+    message_id: int
+    user_id: int
+    channel_id: int
+    text: str
+
+
+class EventRecorder:
+    """
+    Appends the gateway traffic the bot acts on to a compact binary file.
+
+    Each record is a 35-byte header plus a short UTF-8 field (the emoji, the
+    command name, or the raid type and name). On start the recorder writes
+    the active raids and their sign-ups, so a replay begins from the same
+    state; raids opened and retired afterwards are recorded as they happen.
+    Sign-ups corrected from Discord by hydration or reconciliation are written
+    as a SIGNUP_RESET followed by the raid's new sign-ups, so corrections
+    replay too. Writes are buffered and reach the disk every `flush_interval` seconds.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = 0
+        self._file: Optional[BinaryIO] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, raids: Iterable, signups_cache: dict):
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not new:
+            # Drop a record torn by a crash so this session's records stay aligned
+            valid = _valid_length(self.path)
+            if valid < os.path.getsize(self.path):
+                os.truncate(self.path, valid)
+        self._file = open(self.path, "ab", buffering=64 * 1024)
+        if new:
+            self._file.write(MAGIC)
+        for raid in raids:
+            self.raid_opened(raid)
+            self._write_signups(raid, signups_cache.get(raid.raid_id))
+        self._task = asyncio.create_task(self._run(), name="event-recorder")
+        logger.info(f"Recording gateway events to {self.path}")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._file:
+            self._file.close()
+            self._file = None
+            logger.info(f"Recorded {self.records} events to {self.path}")
+
+    # --- Recording -------------------------------------------------------
+
+    def reaction(self, payload: discord.RawReactionActionEvent, added: bool):
+        member = payload.member
+        flags = FLAG_BOT if member is not None and member.bot else 0
+        self._write(REACTION_ADD if added else REACTION_REMOVE, flags, payload.message_id,
+                    payload.user_id, payload.channel_id, str(payload.emoji))
+
+    def interaction(self, interaction: discord.Interaction):
+        data = interaction.data or {}
+        name = data.get("name") or data.get("custom_id") or interaction.type.name
+        self._write(INTERACTION, 0, interaction.id, interaction.user.id, interaction.channel_id or 0, name)
+
+    def raid_opened(self, raid):
+        self._write(RAID_OPEN, 0, raid.raid_id, 0, raid.channel_id, f"{raid.raid_type}{FIELD_SEP}{raid.name}")
+
+    def raid_closed(self, raid_id: int):
+        self._write(RAID_CLOSE, 0, raid_id, 0, 0, "")
+
+    def signups_replaced(self, raid, signups):
+        """A raid's sign-ups were corrected from Discord rather than by a reaction event."""
+        self._write(SIGNUP_RESET, 0, raid.raid_id, 0, raid.channel_id, "")
+        self._write_signups(raid, signups)
+
+    def _write_signups(self, raid, signups):
+        if signups:
+            for emoji, uids in signups.items():
+                for uid in uids:
+                    self._write(SIGNUP, 0, raid.raid_id, uid, raid.channel_id, emoji)
+
+    def _write(self, kind: int, flags: int, message_id: int, user_id: int, channel_id: int, text: str):
+        if self._file is None:
+            return
+        data = text.encode()
+        if len(data) > 255:
+            data = data[:255].decode(errors="ignore").encode()
+        self._file.write(_HEADER.pack(kind, flags, time.time(), message_id, user_id, channel_id, len(data)) + data)
+        self.records += 1
+
+
+def _valid_length(path: str) -> int:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an event recording")
+        end = f.tell()
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return end
+            length = header[-1]
+            if len(f.read(length)) < length:
+                return end
+            end = f.tell()
+
+
+def read_events(path: str) -> Iterator[Event]:
+    """Yield the records of a recording in order; a torn last record is ignored."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an event recording")
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, flags, ts, message_id, user_id, channel_id, length = _HEADER.unpack(header)
+            text = f.read(length)
+            if len(text) < length:
+                return
+            yield Event(kind, flags, ts, message_id, user_id, channel_id, text.decode())
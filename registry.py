@@ -0,0 +1,251 @@
+import asyncio, bisect, logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import discord
+import pytz
+
+from config import TIMEZONE_MAPPING
+from database import db
+from raid_types import RAID_TYPES, RaidTypeDefinition
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Raid:
+    raid_id: int
+    name: str
+    raid_type: str
+    channel_id: int
+    start_ts: int
+    ping_ts: int
+    duration: str
+    tz: str
+    message: Optional[discord.Message] = None
+    # Companion message holding the live roster, once posted
+    roster_message_id: Optional[int] = None
+    # Compiled raid type, resolved once so hot paths skip the config lookups
+    definition: RaidTypeDefinition = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.definition = RAID_TYPES[self.raid_type]
+
+    @property
+    def start_label(self) -> str:
+        """Start time in the raid's own timezone, e.g. 'Sat Jan 18 06:30PM ET'."""
+        tz = pytz.timezone(TIMEZONE_MAPPING.get(self.tz, "UTC"))
+        start = datetime.fromtimestamp(self.start_ts, pytz.utc).astimezone(tz)
+        return f"{start:%a %b %d %I:%M%p} {self.tz}"
+
+
+class RaidRegistry:
+    """
+    Authoritative in-memory store of active raids.
+
+    Every read is served from memory; changes are queued and written through
+    to the `active_raids` table by a single background writer, in order; a
+    burst of changes queued while it was busy is written in one transaction.
+    Secondary indexes map channels to raids, keep raids sorted by start time,
+    and keep casefolded "name start-time" keys sorted for raid search.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._raids: Dict[int, Raid] = {}
+        self._by_channel: Dict[int, Set[int]] = {}
+        self._by_start: List[Tuple[int, int]] = []
+        self._by_name: List[Tuple[str, int]] = []
+        self._keys: Dict[int, str] = {}
+        self._writes: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    # --- Reads -----------------------------------------------------------
+
+    def get(self, raid_id: int) -> Optional[Raid]:
+        return self._raids.get(raid_id)
+
+    def __contains__(self, raid_id: int) -> bool:
+        return raid_id in self._raids
+
+    def __len__(self) -> int:
+        return len(self._raids)
+
+    def __iter__(self) -> Iterator[Raid]:
+        return iter(list(self._raids.values()))
+
+    def newest_first(self) -> List[Raid]:
+        """Raids ordered by raid id (i.e. post time), newest first."""
+        return sorted(self._raids.values(), key=lambda r: r.raid_id, reverse=True)
+
+    def by_start(self) -> List[Raid]:
+        """Raids ordered by start time, soonest first."""
+        return [self._raids[raid_id] for _, raid_id in self._by_start]
+
+    def in_channel(self, channel_id: int) -> List[Raid]:
+        return [self._raids[raid_id] for raid_id in self._by_channel.get(channel_id, ())]
+
+    def search(self, text: str, limit: int = 25) -> List[Raid]:
+        """
+        Raids whose name starts with `text`, then raids whose name or start
+        time contains it, case-insensitively; soonest first when `text` is empty.
+        """
+        query = text.strip().casefold()
+        if not query:
+            return self.by_start()[:limit]
+        found: List[int] = []
+        i = bisect.bisect_left(self._by_name, (query,))
+        while i < len(self._by_name) and len(found) < limit and self._by_name[i][0].startswith(query):
+            found.append(self._by_name[i][1])
+            i += 1
+        if len(found) < limit:
+            prefixed = set(found)
+            for key, raid_id in self._by_name:
+                if query in key and raid_id not in prefixed:
+                    found.append(raid_id)
+                    if len(found) == limit:
+                        break
+        return [self._raids[raid_id] for raid_id in found]
+
+    # --- Writes ----------------------------------------------------------
+
+    def load(self, raid: Raid):
+        """Track a raid that already exists in the database."""
+        self._index(raid)
+
+    def add(self, raid: Raid):
+        self._index(raid)
+        self._write(
+            """
+            INSERT INTO active_raids
+              (raid_id, raid_name, channel_id, raid_type, start_timestamp,
+               ping_timestamp, duration, tz, signups_synced)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+            """,
+            (raid.raid_id, raid.name, raid.channel_id, raid.raid_type, raid.start_ts,
+             raid.ping_ts, raid.duration, raid.tz)
+        )
+
+    def reschedule(self, raid_id: int, start_ts: int, ping_ts: int, duration: str, tz: str):
+        raid = self._raids[raid_id]
+        self._unindex_start(raid)
+        self._unindex_name(raid_id)
+        raid.start_ts, raid.ping_ts, raid.duration, raid.tz = start_ts, ping_ts, duration, tz
+        bisect.insort(self._by_start, (raid.start_ts, raid.raid_id))
+        self._index_name(raid)
+        self._write(
+            "UPDATE active_raids "
+            "SET start_timestamp = ?, ping_timestamp = ?, duration = ?, tz = ? "
+            "WHERE raid_id = ?",
+            (start_ts, ping_ts, duration, tz, raid_id)
+        )
+
+    def remove(self, raid_id: int) -> Optional[Raid]:
+        raid = self._raids.pop(raid_id, None)
+        if raid:
+            self._unindex_start(raid)
+            self._unindex_name(raid_id)
+            channel_raids = self._by_channel.get(raid.channel_id)
+            if channel_raids:
+                channel_raids.discard(raid_id)
+                if not channel_raids:
+                    del self._by_channel[raid.channel_id]
+        # Always delete, in case the row was never loaded into memory
+        self._write("DELETE FROM active_raids WHERE raid_id = ?", (raid_id,))
+        return raid
+
+    def set_roster_message(self, raid_id: int, message_id: Optional[int]):
+        raid = self._raids.get(raid_id)
+        if raid is None:
+            return
+        raid.roster_message_id = message_id
+        self._write("UPDATE active_raids SET roster_message_id = ? WHERE raid_id = ?", (message_id, raid_id))
+
+    def _index(self, raid: Raid):
+        if raid.raid_id in self._raids:
+            self._unindex_start(self._raids[raid.raid_id])
+            self._unindex_name(raid.raid_id)
+        self._raids[raid.raid_id] = raid
+        self._by_channel.setdefault(raid.channel_id, set()).add(raid.raid_id)
+        bisect.insort(self._by_start, (raid.start_ts, raid.raid_id))
+        self._index_name(raid)
+
+    def _index_name(self, raid: Raid):
+        key = self._keys[raid.raid_id] = f"{raid.name} {raid.start_label}".casefold()
+        bisect.insort(self._by_name, (key, raid.raid_id))
+
+    def _unindex_name(self, raid_id: int):
+        key = self._keys.pop(raid_id, None)
+        if key is not None:
+            i = bisect.bisect_left(self._by_name, (key, raid_id))
+            if i < len(self._by_name) and self._by_name[i] == (key, raid_id):
+                del self._by_name[i]
+
+    def _unindex_start(self, raid: Raid):
+        i = bisect.bisect_left(self._by_start, (raid.start_ts, raid.raid_id))
+        if i < len(self._by_start) and self._by_start[i] == (raid.start_ts, raid.raid_id):
+            del self._by_start[i]
+
+    # --- Write-through ---------------------------------------------------
+
+    @property
+    def pending_writes(self) -> int:
+        return self._writes.qsize() if self._writes else 0
+
+    def start(self):
+        if self._writer is None:
+            self._writes = asyncio.Queue()
+            self._writer = asyncio.create_task(self._run(), name="raid-registry-writer")
+
+    async def stop(self):
+        """Drain queued writes, then stop the writer."""
+        if self._writer:
+            await self._writes.join()
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+    async def flush(self):
+        if self._writes:
+            await self._writes.join()
+
+    def _write(self, query: str, params: tuple):
+        if self._writes is None:
+            raise RuntimeError("RaidRegistry.start() must be called before writing.")
+        self._writes.put_nowait((query, params))
+
+    async def _run(self):
+        while True:
+            # Everything queued by the time we wake up goes out under one commit
+            batch = [await self._writes.get()]
+            while not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                await self._apply(batch)
+            finally:
+                for _ in batch:
+                    self._writes.task_done()
+
+    async def _apply(self, batch: List[Tuple[str, tuple]]):
+        if len(batch) > 1:
+            try:
+                async with self.db.transaction() as conn:
+                    for query, params in batch:
+                        await conn.execute(query, params)
+                return
+            except Exception:
+                # Rolled back; retry one by one so a single bad write doesn't lose the rest
+                logger.exception(f"Could not persist {len(batch)} raid changes together; retrying each")
+        for query, params in batch:
+            try:
+                await self.db.execute(query, params)
+            except Exception:
+                logger.exception(f"Could not persist raid change: {query.split()[0]} {params}")
+
+
+# Create a single shared instance
+registry = RaidRegistry(db)
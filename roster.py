@@ -0,0 +1,247 @@
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from discord import Guild, Member
+
+from signups import RaidSignups
+from utils import name_cache
+
+# (sort key, escaped display name, user id); tuples order exactly like the rendered roster
+Entry = Tuple[str, str, int]
+
+# Resolves a user id to a member without making a request
+MemberLookup = Callable[[int], Optional[Member]]
+
+MAX_MESSAGE_LENGTH = 2000
+
+
+def make_entry(member: Member) -> Entry:
+    key, name = name_cache.lookup(member)
+    return (key, name, member.id)
+
+
+class RosterIndex:
+    """
+    Sorted display names for one raid, maintained as reactions come and go.
+
+    Each role keeps a list of entries in sort_key order (bisect insert and
+    delete), and the full roster is a reference-counted union of the roles,
+    so rendering is a linear walk with no sorting. Users that cannot be
+    resolved to a guild member are left out, as before, and retried on the
+    next render. Members come from `guild.get_member` unless a `lookup` is
+    given.
+    """
+
+    def __init__(self, guild: Guild, lookup: Optional[MemberLookup] = None):
+        self.guild = guild
+        self._lookup = lookup or guild.get_member
+        self._roles: Dict[str, List[Entry]] = {}
+        self._all: List[Entry] = []
+        self._entries: Dict[int, Entry] = {}
+        self._refs: Dict[int, int] = {}
+        self._missing: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        """Number of users in the index."""
+        return len(self._entries)
+
+    @classmethod
+    def build(cls, guild: Guild, signups: RaidSignups, lookup: Optional[MemberLookup] = None) -> "RosterIndex":
+        index = cls(guild, lookup)
+        for emoji, uids in signups.items():
+            for uid in uids:
+                index.add(emoji, uid)
+        return index
+
+    def add(self, emoji: str, uid: int, member: Optional[Member] = None):
+        entry = self._entries.get(uid)
+        if entry is None:
+            member = member or self._lookup(uid)
+            if member is None:
+                self._missing.setdefault(emoji, set()).add(uid)
+                return
+            entry = self._entries[uid] = make_entry(member)
+
+        role = self._roles.setdefault(emoji, [])
+        i = bisect_left(role, entry)
+        if i < len(role) and role[i] == entry:
+            return  # already signed up for this role
+        role.insert(i, entry)
+
+        refs = self._refs.get(uid, 0)
+        self._refs[uid] = refs + 1
+        if not refs:
+            insort(self._all, entry)
+
+    def remove(self, emoji: str, uid: int):
+        missing = self._missing.get(emoji)
+        if missing:
+            missing.discard(uid)
+        entry = self._entries.get(uid)
+        role = self._roles.get(emoji)
+        if entry is None or not role:
+            return
+        i = bisect_left(role, entry)
+        if i == len(role) or role[i] != entry:
+            return
+        del role[i]
+
+        refs = self._refs[uid] - 1
+        if refs:
+            self._refs[uid] = refs
+            return
+        del self._refs[uid]
+        del self._entries[uid]
+        j = bisect_left(self._all, entry)
+        del self._all[j]
+
+    def rekey(self, member: Member):
+        """Re-sort a user whose display name changed."""
+        old = self._entries.get(member.id)
+        if old is None:
+            return
+        roles = [emoji for emoji, entries in self._roles.items() if self._contains(entries, old)]
+        for emoji in roles:
+            self.remove(emoji, member.id)
+        for emoji in roles:
+            self.add(emoji, member.id, member)
+
+    def names(self, emoji: str) -> List[str]:
+        self._retry_missing()
+        return [entry[1] for entry in self._roles.get(emoji, ())]
+
+    def all_names(self) -> List[str]:
+        self._retry_missing()
+        return [entry[1] for entry in self._all]
+
+    @staticmethod
+    def _contains(entries: List[Entry], entry: Entry) -> bool:
+        i = bisect_left(entries, entry)
+        return i < len(entries) and entries[i] == entry
+
+    def _retry_missing(self):
+        if not self._missing:
+            return
+        missing, self._missing = self._missing, {}
+        for emoji, uids in missing.items():
+            for uid in uids:
+                self.add(emoji, uid)
+
+
+class RosterCache:
+    """Roster indexes per raid, built on first render and then kept up to date."""
+
+    def __init__(self):
+        # Least recently rendered first
+        self._indexes: "OrderedDict[int, RosterIndex]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def entries(self) -> int:
+        """Users held across every index."""
+        return sum(map(len, self._indexes.values()))
+
+    def evict(self, count: int) -> int:
+        """Drop least recently rendered indexes until about `count` users are gone."""
+        dropped = 0
+        while self._indexes and dropped < count:
+            _, index = self._indexes.popitem(last=False)
+            dropped += len(index)
+        return dropped
+
+    def get(self, raid_id: int, guild: Guild, signups: RaidSignups,
+            lookup: Optional[MemberLookup] = None) -> RosterIndex:
+        index = self._indexes.get(raid_id)
+        if index is None or index.guild is not guild:
+            index = self._indexes[raid_id] = RosterIndex.build(guild, signups, lookup)
+        else:
+            self._indexes.move_to_end(raid_id)
+            if lookup is not None:
+                index._lookup = lookup
+        return index
+
+    def on_add(self, raid_id: int, emoji: str, uid: int, member: Optional[Member] = None):
+        index = self._indexes.get(raid_id)
+        if index:
+            index.add(emoji, uid, member)
+
+    def on_remove(self, raid_id: int, emoji: str, uid: int):
+        index = self._indexes.get(raid_id)
+        if index:
+            index.remove(emoji, uid)
+
+    def on_member_update(self, member: Member):
+        for index in self._indexes.values():
+            index.rekey(member)
+
+    def drop(self, raid_id: int):
+        """Forget a raid's index; the next render rebuilds it from the sign-ups."""
+        self._indexes.pop(raid_id, None)
+
+
+def render_signups(raid_name: str, roles: Iterable[Tuple[str, str]], roster: RosterIndex) -> List[str]:
+    """Build the /showsignups blocks so each section stays intact."""
+    blocks: List[str] = []
+
+    # Title
+    blocks.append(f"**{raid_name}**")
+
+    # Roles header
+    blocks.append("\n__**Roles**__")
+
+    # One block per role
+    for emoji, role_desc in roles:
+        if emoji == "↪️":
+            blocks.append("")  # blank line before backups
+        members    = roster.names(emoji) or ["None"]
+        member_list = ", ".join(members)
+        blocks.append(f"{emoji} {role_desc}\n{member_list}")
+
+    # Full roster & count
+    all_members = roster.all_names() or ["None"]
+    blocks.append(f"\n__**Full Roster**__\n{', '.join(all_members)}")
+    blocks.append(f"\n**Number of Sign-ups:** {len(all_members)}")
+    return blocks
+
+
+def render_live_roster(roles: Iterable[Tuple[str, str]], roster: RosterIndex,
+                       limit: int = MAX_MESSAGE_LENGTH) -> str:
+    """
+    Compact roster for the live section: one line per role with sign-ups,
+    cut to `limit` characters. Empty if not even the header fits.
+    """
+    lines = [f"__**Sign-ups ({len(roster.all_names())})**__"]
+    for emoji, _ in roles:
+        names = roster.names(emoji)
+        if names:
+            lines.append(f"{emoji} {', '.join(names)}")
+    if len(lines) == 1:
+        lines.append("None yet")
+
+    # Drop whole lines from the end until the rest fits with the note
+    text = "\n".join(lines)
+    note = "\n…use /showsignups for the full list"
+    while len(text) > limit and len(lines) > 1:
+        lines.pop()
+        text = "\n".join(lines) + note
+    if len(text) > limit:
+        return lines[0] if len(lines[0]) <= limit else ""
+    return text
+
+
+def chunk_blocks(blocks: Iterable[str], limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Pack blocks into messages of at most `limit` characters without splitting a block."""
+    messages: List[str] = []
+    buffer = ""
+    for block in blocks:
+        chunk = block + "\n"
+        if buffer and len(buffer) + len(chunk) > limit:
+            messages.append(buffer.rstrip())
+            buffer = ""
+        buffer += chunk
+
+    if buffer:
+        messages.append(buffer.rstrip())
+    return messages
@@ -0,0 +1,167 @@
+import asyncio, heapq, itertools, logging, time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Callback signature: (raid_id, offset_seconds, is_final, lateness_seconds)
+ReminderCallback = Callable[[int, int, bool, float], Awaitable[None]]
+
+# Heap entry layout: [deadline, seq, raid_id, offset, is_final, alive]
+_DEADLINE, _SEQ, _RAID, _OFFSET, _FINAL, _ALIVE = range(6)
+
+
+class ReminderScheduler:
+    """
+    One background task that fires raid reminders from a min-heap of deadlines.
+
+    Every raid gets one heap entry per reminder offset. Cancelling marks the
+    entries dead instead of searching the heap, and dead entries are skipped
+    (or compacted away) when they reach the top, so insert, reschedule and
+    cancel all stay O(log n).
+    """
+
+    # Upper bound on a single sleep so wall-clock adjustments are picked up.
+    MAX_SLEEP = 3600.0
+
+    def __init__(self, callback: ReminderCallback, offsets: Iterable[int], late_warning: float = 60.0):
+        self._callback = callback
+        self.offsets = tuple(sorted(set(offsets), reverse=True))
+        if not self.offsets:
+            raise ValueError("At least one reminder offset is required.")
+        self.final_offset = self.offsets[-1]
+        self.late_warning = late_warning
+
+        self._heap: List[list] = []
+        self._entries: Dict[int, List[list]] = {}
+        self._seq = itertools.count()
+        self._dead = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+        self.fired = 0
+        self.skipped_stale = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of reminders still waiting to fire."""
+        return sum(len(entries) for entries in self._entries.values())
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="reminder-scheduler")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._inflight):
+            task.cancel()
+
+    def schedule(self, raid_id: int, start_ts: int, now: Optional[float] = None) -> int:
+        """
+        (Re)schedule every reminder for a raid starting at start_ts.
+
+        Early reminders whose deadline already passed are dropped; the final
+        reminder is always queued so it fires immediately if it is overdue.
+        Returns the number of reminders queued.
+        """
+        self.cancel(raid_id)
+        now = time.time() if now is None else now
+        entries = []
+        for offset in self.offsets:
+            deadline = start_ts - offset
+            is_final = offset == self.final_offset
+            if deadline <= now and not is_final:
+                continue
+            entry = [deadline, next(self._seq), raid_id, offset, is_final, True]
+            heapq.heappush(self._heap, entry)
+            entries.append(entry)
+        self._entries[raid_id] = entries
+
+        # Only wake the loop when the earliest deadline moved
+        if entries and self._heap[0] is entries[0] and self._wakeup:
+            self._wakeup.set()
+        return len(entries)
+
+    def cancel(self, raid_id: int) -> bool:
+        """Drop every pending reminder for a raid."""
+        entries = self._entries.pop(raid_id, None)
+        if not entries:
+            return False
+        for entry in entries:
+            entry[_ALIVE] = False
+        self._dead += len(entries)
+        # Rebuild once tombstones dominate the heap
+        if self._dead > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[_ALIVE]]
+            heapq.heapify(self._heap)
+            self._dead = 0
+        return True
+
+    def next_deadline(self, raid_id: int) -> Optional[int]:
+        entries = self._entries.get(raid_id)
+        return min(e[_DEADLINE] for e in entries) if entries else None
+
+    async def _run(self):
+        while True:
+            self._discard_dead()
+            if not self._heap:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            delay = self._heap[0][_DEADLINE] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, self.MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            self._fire_due(time.time())
+
+    def _discard_dead(self):
+        while self._heap and not self._heap[0][_ALIVE]:
+            heapq.heappop(self._heap)
+            self._dead -= 1
+
+    def _fire_due(self, now: float):
+        # Drain everything that is due; after a loop stall this may be many entries
+        due: Dict[int, List[list]] = {}
+        while self._heap and self._heap[0][_DEADLINE] <= now:
+            entry = heapq.heappop(self._heap)
+            if not entry[_ALIVE]:
+                self._dead -= 1
+                continue
+            due.setdefault(entry[_RAID], []).append(entry)
+
+        for raid_id, entries in due.items():
+            fired_ids = {id(e) for e in entries}
+            remaining = [e for e in self._entries.get(raid_id, []) if id(e) not in fired_ids]
+            if remaining:
+                self._entries[raid_id] = remaining
+            else:
+                self._entries.pop(raid_id, None)
+
+            # Catch-up: only the most recent reminder of a raid is still worth sending
+            entries.sort(key=lambda e: e[_DEADLINE])
+            latest = entries[-1]
+            self.skipped_stale += len(entries) - 1
+            lateness = now - latest[_DEADLINE]
+            if lateness > self.late_warning:
+                logger.warning(f"Reminder for raid {raid_id} firing {lateness:.1f}s late.")
+
+            self.fired += 1
+            task = asyncio.create_task(
+                self._callback(raid_id, latest[_OFFSET], latest[_FINAL], lateness),
+                name=f"reminder:{raid_id}"
+            )
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
@@ -0,0 +1,112 @@
+import asyncio, logging, time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SeedProgress:
+    raid_id: int
+    total: int
+    added: int = 0
+    cleared: int = 0
+    status: str = "running"  # running | done | failed | cancelled
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+
+class ReactionSeeder:
+    """
+    Adds the bot's sign-up reactions to new raid posts in the background.
+
+    The whole emoji list is planned up front and requests are spaced
+    `interval` seconds apart to stay inside Discord's reaction bucket rather
+    than waiting for 429s. Reactions users added before the bot got to an
+    emoji are live sign-ups and are left in place. If the post hits the
+    20-unique-reaction limit, the message is fetched once and every foreign
+    reaction is cleared in a single pass before seeding continues.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.progress: Dict[int, SeedProgress] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._next_slot: Dict[int, float] = {}
+
+    @property
+    def running(self) -> int:
+        return len(self._tasks)
+
+    def seed(self, message: discord.Message, emojis: Iterable[str]) -> SeedProgress:
+        """Start seeding `emojis` on `message`."""
+        plan = list(emojis)
+        progress = SeedProgress(raid_id=message.id, total=len(plan))
+        self.progress[message.id] = progress
+        task = asyncio.create_task(self._run(message, plan, progress), name=f"seed:{message.id}")
+        self._tasks[message.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(message.id, None))
+        return progress
+
+    def cancel(self, raid_id: int):
+        task = self._tasks.pop(raid_id, None)
+        if task:
+            task.cancel()
+        self.progress.pop(raid_id, None)
+
+    async def stop(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    async def _run(self, message: discord.Message, plan: List[str], progress: SeedProgress):
+        allowed = set(plan)
+        cleaned = False
+        try:
+            for emoji in plan:
+                try:
+                    await self._paced(message, message.add_reaction, emoji)
+                except discord.Forbidden:
+                    if cleaned:
+                        raise
+                    logger.warning("Max unique reactions reached; pruning unauthorized emojis")
+                    progress.cleared += await self._clear_foreign(message, allowed)
+                    cleaned = True
+                    # Retry adding only this emoji
+                    await self._paced(message, message.add_reaction, emoji)
+                progress.added += 1
+            progress.status = "done"
+            logger.info(f"Seeded {progress.added} reactions on raid {progress.raid_id} in {progress.elapsed:.1f}s")
+        except asyncio.CancelledError:
+            progress.status = "cancelled"
+            raise
+        except Exception as e:
+            progress.status = "failed"
+            logger.error(f"Reaction seeding failed for raid {progress.raid_id} "
+                         f"after {progress.added}/{progress.total}: {e}")
+        finally:
+            progress.finished = time.monotonic()
+
+    async def _clear_foreign(self, message: discord.Message, allowed: Set[str]) -> int:
+        # One fetch for the current reaction state, then clear everything foreign
+        fresh = await self._paced(message, message.channel.fetch_message, message.id)
+        foreign = [r.emoji for r in fresh.reactions if str(r.emoji) not in allowed]
+        for emoji in foreign:
+            await self._paced(message, message.clear_reaction, emoji)
+        return len(foreign)
+
+    async def _paced(self, message: discord.Message, call: Callable[..., Awaitable], *args):
+        # Reserve the next free slot in the channel's reaction bucket before issuing the call
+        channel_id = message.channel.id
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(channel_id, 0.0))
+        self._next_slot[channel_id] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return await call(*args)
@@ -0,0 +1,96 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+from raid_types import RaidTypeDefinition
+
+# Discord snowflakes are unsigned 64-bit integers
+UID_TYPECODE = "Q"
+
+_EMPTY: Tuple[int, ...] = ()
+
+
+class RaidSignups:
+    """
+    Compact sign-up storage for one raid.
+
+    Emoji are interned to the slot numbers of the raid type definition and
+    each slot holds its user ids in a sorted `array('Q')`, so a sign-up costs
+    8 bytes instead of a boxed int plus a set entry. Membership is a binary
+    search. Reactions outside the definition are never stored; the pruner
+    removes them from the post.
+    """
+
+    __slots__ = ("definition", "_slots")
+
+    def __init__(self, definition: RaidTypeDefinition):
+        self.definition = definition
+        self._slots: List[array] = [array(UID_TYPECODE) for _ in definition.emojis]
+
+    @classmethod
+    def from_mapping(cls, definition: RaidTypeDefinition, signups: Mapping[str, Iterable[int]]) -> "RaidSignups":
+        raid = cls(definition)
+        for emoji, uids in signups.items():
+            raid.replace(emoji, uids)
+        return raid
+
+    # --- Reads -----------------------------------------------------------
+
+    def get(self, emoji: str, default: Sequence[int] = _EMPTY) -> Sequence[int]:
+        """User ids signed up with `emoji`, in ascending order."""
+        slot = self.definition.slots.get(emoji)
+        return default if slot is None else self._slots[slot]
+
+    def count(self, emoji: str) -> int:
+        return len(self.get(emoji))
+
+    def has(self, emoji: str, uid: int) -> bool:
+        uids = self.get(emoji)
+        i = bisect_left(uids, uid)
+        return i < len(uids) and uids[i] == uid
+
+    def items(self) -> Iterator[Tuple[str, array]]:
+        """(emoji, user ids) for every emoji with at least one sign-up."""
+        return ((emoji, uids) for emoji, uids in zip(self.definition.emojis, self._slots) if uids)
+
+    def keys(self) -> List[str]:
+        return [emoji for emoji, _ in self.items()]
+
+    def __len__(self) -> int:
+        """Total sign-ups across every emoji."""
+        return sum(map(len, self._slots))
+
+    # --- Writes ----------------------------------------------------------
+
+    def add(self, emoji: str, uid: int) -> bool:
+        """Record a sign-up; returns False if the emoji is foreign or it was already there."""
+        slot = self.definition.slots.get(emoji)
+        if slot is None:
+            return False
+        uids = self._slots[slot]
+        i = bisect_left(uids, uid)
+        if i < len(uids) and uids[i] == uid:
+            return False
+        uids.insert(i, uid)
+        return True
+
+    def discard(self, emoji: str, uid: int) -> bool:
+        slot = self.definition.slots.get(emoji)
+        if slot is None:
+            return False
+        uids = self._slots[slot]
+        i = bisect_left(uids, uid)
+        if i == len(uids) or uids[i] != uid:
+            return False
+        del uids[i]
+        return True
+
+    def replace(self, emoji: str, uids: Iterable[int]):
+        """Overwrite one emoji's sign-ups, e.g. with a page read from Discord."""
+        slot = self.definition.slots.get(emoji)
+        if slot is not None:
+            self._slots[slot] = array(UID_TYPECODE, sorted(set(uids)))
+
+    def clear(self, emoji: str):
+        self.replace(emoji, ())
+
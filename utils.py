@@ -1,13 +1,14 @@
 import re
 from datetime import datetime
 from functools import wraps
-from typing import Iterable, List
+from collections import OrderedDict
+from typing import Dict, Tuple
 import unicodedata
 
-from discord import Guild, Interaction
+from discord import Interaction, Member
 from discord.utils import escape_markdown
 
-from config import GUILD_LEADER_ROLE_ID, RAID_CAPTAIN_ROLE_ID, GUILD_MEMBER_PING, TEST_CHANNEL_ID
+from config import GUILD_LEADER_ROLE_ID, RAID_CAPTAIN_ROLE_ID, GUILD_MEMBER_PING, NAME_CACHE_SIZE, TEST_CHANNEL_ID
 
 # Permission decorator
 def permission_check(func):
@@ -22,10 +23,31 @@ def permission_check(func):
         return await func(interaction, *args, **kwargs)
     return wrapper
 
+def admin_check(func):
+    @wraps(func)
+    async def wrapper(interaction: Interaction, *args, **kwargs):
+        if not interaction.user.guild_permissions.administrator:
+            return await interaction.response.send_message(
+                "Only server administrators can use this command.",
+                ephemeral=True
+            )
+        return await func(interaction, *args, **kwargs)
+    return wrapper
+
 def get_ping_mention(channel_id: int) -> str:
     """Return TEST MODE in the test channel, otherwise the real guild member ping."""
     return "TEST MODE" if channel_id == TEST_CHANNEL_ID else GUILD_MEMBER_PING
 
+def format_offset(seconds: int) -> str:
+    """Render a reminder offset like '30 minutes', '1 hour' or '1 hour 30 minutes'."""
+    hours, minutes = divmod(seconds // 60, 60)
+    parts = []
+    if hours:
+        parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
+    if minutes or not parts:
+        parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
+    return " ".join(parts)
+
 # Time parsing patterns for user input
 _TIME_PATTERNS = [
     (re.compile(r"^(\d{1,2}):?(\d{2})?([AP]M)$", re.IGNORECASE),
@@ -81,16 +103,58 @@ def sort_key(name: str) -> str:
     ascii_only  = normalized.encode("ascii", "ignore").decode("ascii")
     return ascii_only.lower()
 
-def get_sorted_display_names(
-    uids: Iterable[int], guild: Guild, key_func=sort_key
-) -> List[str]:
+class NameCache:
     """
-    Given user IDs and a Guild, return escaped & alphabetically sorted
-    display names, normalizing special Unicode via sort_key.
+    Bounded LRU of (sort key, escaped display name) per user id.
+
+    Entries are invalidated from the member/user update events when a
+    display name changes, so renders never redo escape_markdown and the
+    NFKD normalization for an unchanged name.
     """
-    names = []
-    for uid in uids:
-        member = guild.get_member(uid)
-        if member:
-            names.append(escape_markdown(member.display_name))
-    return sorted(names, key=key_func)
\ No newline at end of file
+
+    def __init__(self, maxsize: int = 5000):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, member: Member) -> Tuple[str, str]:
+        entry = self._entries.get(member.id)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(member.id)
+            return entry
+        self.misses += 1
+        name = escape_markdown(member.display_name)
+        entry = self._entries[member.id] = (sort_key(name), name)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, user_id: int) -> bool:
+        return self._entries.pop(user_id, None) is not None
+
+    def evict(self, count: int) -> int:
+        """Drop up to `count` least recently used entries."""
+        count = min(count, len(self._entries))
+        for _ in range(count):
+            self._entries.popitem(last=False)
+        self.evictions += count
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+# Shared display-name cache
+name_cache = NameCache(NAME_CACHE_SIZE)
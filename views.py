@@ -3,7 +3,8 @@ from discord.ui import Button, Modal, Select, View
 import pytz
 from datetime import datetime, timedelta
 
-from config import TIMEZONE_MAPPING, RAID_TEMPLATES
+from config import REMINDER_OFFSETS, TIMEZONE_MAPPING
+from raid_types import RAID_TYPES
 from utils import validate_time_input
 
 class CreateRaidFlow:
@@ -65,7 +66,7 @@ class TimeButton(Button):
         tz = pytz.timezone(TIMEZONE_MAPPING[view.flow.tz])
         localized_dt = tz.localize(local_dt, is_dst=None)
         start_ts = int(localized_dt.astimezone(pytz.utc).timestamp())
-        ping_ts = start_ts - 30 * 60
+        ping_ts = start_ts - min(REMINDER_OFFSETS)
 
         # Attach timestamps to flow for the command handler
         view.flow._start_ts = start_ts
@@ -125,7 +126,7 @@ class CreateRaidView(View):
         self.flow = flow
         
         # Raid type dropdown
-        raid_options = [discord.SelectOption(label=k, value=k) for k in RAID_TEMPLATES]
+        raid_options = [discord.SelectOption(label=k, value=k) for k in RAID_TYPES]
         self.add_item(FlowSelect(name="raid_type", options=raid_options, row=0, placeholder="Select Raid"))
 
         # Duration dropdown